@@ -5,69 +5,113 @@ Provides intelligent bulk mapping generation for IEC 60870-5-104 protocol
 with smart IOA (Information Object Address) allocation and data type detection.
 """
 
+import re
+from dataclasses import dataclass
+from functools import lru_cache
 from typing import List, Dict, Any, Optional
-from ..core.datastore import DATA_STORE
-from ..core.mapping_store import IEC104_MAPPING
+from .core.datastore import DATA_STORE
+from .core.mapping_store import IEC104_MAPPING
 
 
-def _map_to_iec104_data_type(original_type: str, units: str = "", key_name: str = "") -> str:
+# Needle-category tables driving the classifier, kept as plain data and
+# compiled once into single alternation patterns so each field is scanned
+# once instead of running one substring scan per keyword
+_MEASUREMENT_NAME_NEEDLES = ('temp', 'pressure', 'flow', 'vibrat', 'power')
+_MEASUREMENT_UNITS_NEEDLES = ('°c', '°f', 'hpa', 'bar', 'psi', 'l/min', 'm3/h', 'mm/s', 'kw', 'w')
+_STATUS_NAME_NEEDLES = ('status', 'enabled', 'motor')
+_MEASUREMENT_NAME_RE = re.compile('|'.join(map(re.escape, _MEASUREMENT_NAME_NEEDLES)))
+_MEASUREMENT_UNITS_RE = re.compile('|'.join(map(re.escape, _MEASUREMENT_UNITS_NEEDLES)))
+_STATUS_NAME_RE = re.compile('|'.join(map(re.escape, _STATUS_NAME_NEEDLES)))
+
+# Exact-type fastpath for the common case where no units/key context is
+# given; one dict hit instead of the substring rules below
+_EXACT_TYPES = {
+    'bool': 'M_SP_NA_1', 'boolean': 'M_SP_NA_1',
+    'int': 'M_ME_NB_1', 'integer': 'M_ME_NB_1',
+    'float': 'M_ME_NC_1', 'double': 'M_ME_NC_1'
+}
+
+
+@dataclass(slots=True)
+class _MappingResult:
+    """Per-row outcome record; slotted so large bulk result sets stay compact
+    and only become dicts at the JSON boundary"""
+    data_id: str
+    ok: bool
+    error: Optional[str] = None
+    key: Optional[str] = None
+    ioa: int = 0
+    type: str = ''
+    cause: str = ''
+    original_data_type: str = ''
+    units: str = ''
+
+    def to_dict(self) -> Dict[str, Any]:
+        if not self.ok:
+            return {'data_id': self.data_id, 'ok': False, 'error': self.error}
+        return {
+            'data_id': self.data_id,
+            'key': self.key,
+            'ioa': self.ioa,
+            'type': self.type,
+            'cause': self.cause,
+            'original_data_type': self.original_data_type,
+            'units': self.units,
+            'ok': True
+        }
+
+# Last detailed snapshot keyed by the store's version counter, so
+# back-to-back bulk calls don't rebuild the full O(K) dict
+_snapshot_cache = {'version': None, 'snapshot': None}
+
+
+def _current_snapshot() -> Dict[str, Dict]:
+    """Return the detailed snapshot, reusing the cached copy when the store
+    has not changed since the last bulk call"""
+    version = DATA_STORE.version
+    if _snapshot_cache['version'] != version:
+        _snapshot_cache['snapshot'] = DATA_STORE.detailed_snapshot()
+        _snapshot_cache['version'] = version
+    return _snapshot_cache['snapshot']
+
+
+def _build_iec104_classifier():
     """
-    Intelligently map original data type to appropriate IEC 104 data type
-    
-    Args:
-        original_type: Original data type from data store
-        units: Units string for additional context
-        key_name: Key name for additional context
-        
-    Returns:
-        Appropriate IEC 104 data type
+    Generate the type classifier as straight-line code at import time.
+
+    The search callables and the exact-match table are bound into the exec
+    namespace, so the compiled body maps (lowercased) original_type, units
+    and key_name to an IEC 104 data type without any global lookups. Rules:
+    exact type match when no context is given, then the measurement
+    keywords (short float), status keywords (single point), integers
+    (scaled), and short float for everything else.
     """
-    original_type = original_type.lower()
-    units = units.lower()
-    key_name = key_name.lower()
-    
-    # Temperature measurements - use M_ME_NC_1 (measured value, short float)
-    if 'temp' in original_type or 'temp' in key_name or '°c' in units or '°f' in units:
-        return 'M_ME_NC_1'
-    
-    # Pressure measurements - use M_ME_NC_1 (measured value, short float)
-    if 'pressure' in original_type or 'pressure' in key_name or 'hpa' in units or 'bar' in units or 'psi' in units:
-        return 'M_ME_NC_1'
-    
-    # Flow rate measurements - use M_ME_NC_1 (measured value, short float)
-    if 'flow' in original_type or 'flow' in key_name or 'l/min' in units or 'm3/h' in units:
-        return 'M_ME_NC_1'
-    
-    # Vibration measurements - use M_ME_NC_1 (measured value, short float)
-    if 'vibrat' in original_type or 'vibrat' in key_name or 'mm/s' in units:
-        return 'M_ME_NC_1'
-    
-    # Power measurements - use M_ME_NC_1 (measured value, short float)
-    if 'power' in original_type or 'power' in key_name or 'kw' in units or 'w' in units:
-        return 'M_ME_NC_1'
-    
-    # Boolean/Status values - use M_SP_NA_1 (single point information)
-    if (original_type == 'bool' or original_type == 'boolean' or 
-        'status' in key_name or 'enabled' in key_name or 'motor' in key_name):
-        return 'M_SP_NA_1'
-    
-    # Integer values - use M_ME_NB_1 (measured value, scaled)
-    if original_type == 'int' or original_type == 'integer':
-        # Check if it's a percentage (0-100)
-        if 'position' in key_name or '%' in units:
-            return 'M_ME_NB_1'
-        # Check if it's a status code or alarm
-        elif 'code' in key_name or 'alarm' in key_name:
-            return 'M_ME_NB_1'
-        else:
-            return 'M_ME_NB_1'
-    
-    # Float values - use M_ME_NC_1 (measured value, short float)
-    if original_type == 'float' or original_type == 'double':
-        return 'M_ME_NC_1'
-    
-    # Default to measured value for unknown types
-    return 'M_ME_NC_1'
+    ns = {
+        '_exact_get': _EXACT_TYPES.get,
+        '_name_search': _MEASUREMENT_NAME_RE.search,
+        '_units_search': _MEASUREMENT_UNITS_RE.search,
+        '_status_search': _STATUS_NAME_RE.search,
+    }
+    src = (
+        'def classify(original_type, units="", key_name=""):\n'
+        '    if not units and not key_name:\n'
+        '        hit = _exact_get(original_type)\n'
+        '        if hit:\n'
+        '            return hit\n'
+        '    if (_name_search(original_type) or _name_search(key_name)\n'
+        '            or _units_search(units)):\n'
+        "        return 'M_ME_NC_1'\n"
+        "    if original_type in ('bool', 'boolean') or _status_search(key_name):\n"
+        "        return 'M_SP_NA_1'\n"
+        "    if original_type in ('int', 'integer'):\n"
+        "        return 'M_ME_NB_1'\n"
+        "    return 'M_ME_NC_1'\n"
+    )
+    exec(compile(src, '<iec104_classifier>', 'exec'), ns)
+    return ns['classify']
+
+
+_map_to_iec104_data_type = lru_cache(maxsize=1024)(_build_iec104_classifier())
 
 
 def _get_iec104_cause_of_transmission(data_type: str, key_name: str = "") -> str:
@@ -81,8 +125,6 @@ def _get_iec104_cause_of_transmission(data_type: str, key_name: str = "") -> str
     Returns:
         Cause of transmission string
     """
-    key_name = key_name.lower()
-    
     # Status/Boolean values - spontaneous
     if data_type == 'M_SP_NA_1':
         return 'spontaneous'
@@ -95,6 +137,23 @@ def _get_iec104_cause_of_transmission(data_type: str, key_name: str = "") -> str
     return 'spontaneous'
 
 
+# Type-specific IOA ranges for better organization, compiled once into an
+# integer type code plus a tuple-indexed range table
+_TYPE_CODES = {
+    'M_ME_NC_1': 0,    # Measured values (float)
+    'M_ME_NB_1': 1,    # Scaled values (int)
+    'M_SP_NA_1': 2,    # Single point information (bool)
+    'M_ME_NA_1': 3,    # Normalized values
+    'M_ME_NF_1': 4     # Floating point values
+}
+_TYPE_RANGES = ((1000, 2000), (2000, 3000), (3000, 4000), (4000, 5000), (5000, 6000))
+_DEFAULT_RANGE = (1000, 10000)
+
+# Stored verbatim on every generated mapping; %-formatting avoids the
+# per-row f-string compile-and-join overhead on large batches
+_DESCRIPTION_TEMPLATE = 'Auto-generated for %s (%s)'
+
+
 def _allocate_ioa_by_type(current_ioa: int, data_type: str, key_name: str = "") -> int:
     """
     Smart IOA allocation that groups by data type with padding
@@ -107,27 +166,12 @@ def _allocate_ioa_by_type(current_ioa: int, data_type: str, key_name: str = "")
     Returns:
         Allocated IOA
     """
-    # Define type-specific IOA ranges for better organization
-    type_ranges = {
-        'M_ME_NC_1': (1000, 2000),    # Measured values (float)
-        'M_ME_NB_1': (2000, 3000),    # Scaled values (int)
-        'M_SP_NA_1': (3000, 4000),    # Single point information (bool)
-        'M_ME_NA_1': (4000, 5000),    # Normalized values
-        'M_ME_NF_1': (5000, 6000)     # Floating point values
-    }
-    
-    start_range, end_range = type_ranges.get(data_type, (1000, 10000))
-    
-    # Ensure we don't exceed the range
-    if current_ioa + 1 > end_range:
-        # Move to next available range
-        return start_range
-    
-    # Add padding between different data types
-    if current_ioa < start_range:
-        return start_range
-    
-    return current_ioa
+    code = _TYPE_CODES.get(data_type, -1)
+    start_range, end_range = _TYPE_RANGES[code] if code >= 0 else _DEFAULT_RANGE
+
+    # Clamp up into the type's range, wrapping to its start on overflow
+    ioa = max(current_ioa, start_range)
+    return start_range if ioa + 1 > end_range else ioa
 
 
 def auto_generate_iec104_mappings(
@@ -156,88 +200,116 @@ def auto_generate_iec104_mappings(
     """
     results = []
     errors = []
+    successful = 0
+    failed = 0
     current_ioa = start_ioa
-    
-    # Get detailed data store info for smart type detection
-    detailed_snapshot = DATA_STORE.detailed_snapshot()
-    
-    for i, data_id in enumerate(data_ids):
+    pending_mappings = []
+
+    # Get detailed data store info for smart type detection. Small batches
+    # fetch only the requested rows; larger ones reuse the cached full
+    # snapshot (kept current while the store version is unchanged)
+    if len(data_ids) * 4 < len(DATA_STORE):
+        detailed_snapshot = DATA_STORE.get_details_by_ids(data_ids)
+    else:
+        detailed_snapshot = _current_snapshot()
+
+    # Reverse id -> key index so each lookup is O(1) instead of scanning
+    # the whole snapshot per data_id
+    id_to_key = DATA_STORE._id_to_key
+
+    # Prefetch (key, data_type, units) columns in one pass so the hot loop
+    # below works on plain tuples instead of re-hashing dict fields per row
+    rows = []
+    for data_id in data_ids:
+        key = id_to_key.get(data_id)
+        data_point = detailed_snapshot.get(key) if key else None
+        if data_point is None:
+            rows.append(None)
+        else:
+            data_type = data_point['data_type']
+            units = data_point.get('units', '')
+            # Lowercase once here so the classifier helpers never re-allocate
+            rows.append((key, data_type, units,
+                         data_type.lower(), units.lower(), key.lower()))
+
+    # Resolve the padding strategy once; the sequential path is pure
+    # arithmetic and never consults the type-range allocator
+    by_type = padding_strategy == 'data_type'
+    auto_cause = cause == 'auto'
+    # Bind hot callables to locals to avoid repeated global lookups
+    classify = _map_to_iec104_data_type
+    allocate = _allocate_ioa_by_type
+    cause_for = _get_iec104_cause_of_transmission
+
+    for i, (data_id, row) in enumerate(zip(data_ids, rows)):
         try:
-            # Find the data point by ID
-            data_point = None
-            for key, info in detailed_snapshot.items():
-                if DATA_STORE._key_to_id.get(key) == data_id:
-                    data_point = info
-                    break
-            
-            if not data_point:
+            if row is None:
                 errors.append(f"Data ID {data_id} not found in data store")
-                results.append({
-                    'data_id': data_id,
-                    'ok': False,
-                    'error': 'Data ID not found'
-                })
+                results.append(_MappingResult(data_id, False, 'Data ID not found'))
+                failed += 1
                 continue
-            
-            key = data_point['key']
-            original_data_type = data_point['data_type']
-            units = data_point.get('units', '')
-            
+
+            key, original_data_type, units, type_l, units_l, key_l = row
+
             # Smart IEC 104 data type mapping
-            iec104_data_type = _map_to_iec104_data_type(original_data_type, units, key)
+            iec104_data_type = classify(type_l, units_l, key_l)
             
             # Smart IOA allocation
-            if padding_strategy == 'data_type':
+            if by_type:
                 # Group by data type and allocate ranges
-                current_ioa = _allocate_ioa_by_type(current_ioa, iec104_data_type, key)
+                current_ioa = allocate(current_ioa, iec104_data_type, key)
             else:
                 # Sequential allocation
                 current_ioa = start_ioa + i
-            
+
             # Determine cause of transmission
-            if cause == 'auto':
-                transmission_cause = _get_iec104_cause_of_transmission(iec104_data_type, key)
+            if auto_cause:
+                transmission_cause = cause_for(iec104_data_type, key)
             else:
                 transmission_cause = cause
             
-            # Create mapping
-            IEC104_MAPPING.set_mapping(
-                data_id, key, current_ioa, iec104_data_type,
-                transmission_cause, quality, timestamp, access,
-                f"Auto-generated for {key} ({original_data_type})"
-            )
-            
-            results.append({
-                'data_id': data_id,
-                'key': key,
+            # Queue mapping; all rows are stored under one lock after the loop
+            pending_mappings.append((data_id, key, {
                 'ioa': current_ioa,
                 'type': iec104_data_type,
                 'cause': transmission_cause,
                 'quality': quality,
                 'timestamp': timestamp,
-                'original_data_type': original_data_type,
-                'units': units,
-                'ok': True
-            })
+                'access': access,
+                'description': _DESCRIPTION_TEMPLATE % (key, original_data_type)
+            }))
+
+            results.append(_MappingResult(
+                data_id, True, None, key, current_ioa, iec104_data_type,
+                transmission_cause, original_data_type, units
+            ))
+            successful += 1
             
             # Move to next IOA
             current_ioa += 1
             
         except Exception as e:
             errors.append(f"Error processing {data_id}: {str(e)}")
-            results.append({
-                'data_id': data_id,
-                'ok': False,
-                'error': str(e)
-            })
-    
+            results.append(_MappingResult(data_id, False, str(e)))
+            failed += 1
+
+    # Store all generated mappings in one locked batch
+    if pending_mappings:
+        IEC104_MAPPING.set_mappings_bulk(pending_mappings)
+
     return {
         'ok': len(errors) == 0,
         'total_requested': len(data_ids),
-        'successful': len([r for r in results if r.get('ok')]),
-        'failed': len([r for r in results if not r.get('ok')]),
-        'results': results,
+        'successful': successful,
+        'failed': failed,
+        'results': [r.to_dict() for r in results],
         'errors': errors,
+        # Batch-constant attributes are reported once instead of per row
+        'common': {
+            'quality': quality,
+            'timestamp': timestamp,
+            'access': access
+        },
         'ioa_range': {
             'start': start_ioa,
             'end': current_ioa - 1,
@@ -246,14 +318,9 @@ def auto_generate_iec104_mappings(
     }
 
 
-def get_iec104_data_types() -> Dict[str, Dict[str, Any]]:
-    """
-    Get information about supported IEC 104 data types
-    
-    Returns:
-        Dictionary with IEC 104 data type information
-    """
-    return {
+# Static reference tables shared across calls; built once at import so the
+# info endpoints don't rebuild large constant dicts per request
+_IEC104_DATA_TYPES = {
         'M_SP_NA_1': {
             'description': 'Single Point Information',
             'use_cases': ['Status', 'Boolean values', 'On/Off states'],
@@ -304,15 +371,7 @@ def get_iec104_data_types() -> Dict[str, Dict[str, Any]]:
         }
     }
 
-
-def get_iec104_causes_of_transmission() -> Dict[str, str]:
-    """
-    Get information about IEC 104 causes of transmission
-    
-    Returns:
-        Dictionary with cause descriptions
-    """
-    return {
+_IEC104_CAUSES_OF_TRANSMISSION = {
         'spontaneous': 'Spontaneous transmission (immediate)',
         'periodic': 'Periodic transmission (scheduled)',
         'request': 'Requested transmission (on demand)',
@@ -331,3 +390,23 @@ def get_iec104_causes_of_transmission() -> Dict[str, str]:
         'unknown_asdu': 'Unknown ASDU',
         'unknown_information_object': 'Unknown information object'
     }
+
+
+def get_iec104_data_types() -> Dict[str, Dict[str, Any]]:
+    """
+    Get information about supported IEC 104 data types
+    
+    Returns:
+        Dictionary with IEC 104 data type information
+    """
+    return _IEC104_DATA_TYPES
+
+
+def get_iec104_causes_of_transmission() -> Dict[str, str]:
+    """
+    Get information about IEC 104 causes of transmission
+    
+    Returns:
+        Dictionary with cause descriptions
+    """
+    return _IEC104_CAUSES_OF_TRANSMISSION
@@ -5,70 +5,128 @@ Provides intelligent bulk mapping generation for Modbus protocol
 with smart address allocation and data type detection.
 """
 
+import re
+from dataclasses import dataclass
+from functools import lru_cache
 from typing import List, Dict, Any, Optional
-from ..core.datastore import DATA_STORE
-from ..core.mapping_store import MODBUS_MAPPING
+from .core.datastore import DATA_STORE
+from .core.mapping_store import MODBUS_MAPPING
 
 
-def _map_to_modbus_data_type(original_type: str, units: str = "") -> str:
+# Needle-category tables driving the classifier, kept as plain data and
+# compiled once into single alternation patterns so each field is scanned
+# once instead of running one substring scan per keyword
+_MEASUREMENT_NAME_NEEDLES = ('temp', 'pressure', 'flow', 'vibrat', 'power')
+_MEASUREMENT_UNITS_NEEDLES = ('°c', '°f', 'hpa', 'bar', 'psi', 'l/min', 'm3/h', 'mm/s', 'kw', 'w')
+_MEASUREMENT_NAME_RE = re.compile('|'.join(map(re.escape, _MEASUREMENT_NAME_NEEDLES)))
+_MEASUREMENT_UNITS_RE = re.compile('|'.join(map(re.escape, _MEASUREMENT_UNITS_NEEDLES)))
+
+# Exact-type fastpath for the common case where no units context is given;
+# one dict hit instead of the substring rules below
+_EXACT_TYPES = {
+    'bool': 'int16', 'boolean': 'int16',
+    'int': 'int32', 'integer': 'int32',
+    'float': 'float32', 'double': 'float32',
+    'string': 'string8', 'str': 'string8'
+}
+
+
+@dataclass(slots=True)
+class _MappingResult:
+    """Per-row outcome record; slotted so large bulk result sets stay compact
+    and only become dicts at the JSON boundary"""
+    data_id: str
+    ok: bool
+    error: Optional[str] = None
+    key: Optional[str] = None
+    register_address: int = 0
+    data_type: str = ''
+    register_count: int = 0
+    original_data_type: str = ''
+    units: str = ''
+
+    def to_dict(self) -> Dict[str, Any]:
+        if not self.ok:
+            return {'data_id': self.data_id, 'ok': False, 'error': self.error}
+        return {
+            'data_id': self.data_id,
+            'key': self.key,
+            'register_address': self.register_address,
+            'data_type': self.data_type,
+            'register_count': self.register_count,
+            'original_data_type': self.original_data_type,
+            'units': self.units,
+            'ok': True
+        }
+
+
+# Last detailed snapshot keyed by the store's version counter, so
+# back-to-back bulk calls don't rebuild the full O(K) dict
+_snapshot_cache = {'version': None, 'snapshot': None}
+
+
+def _current_snapshot() -> Dict[str, Dict]:
+    """Return the detailed snapshot, reusing the cached copy when the store
+    has not changed since the last bulk call"""
+    version = DATA_STORE.version
+    if _snapshot_cache['version'] != version:
+        _snapshot_cache['snapshot'] = DATA_STORE.detailed_snapshot()
+        _snapshot_cache['version'] = version
+    return _snapshot_cache['snapshot']
+
+
+def _build_modbus_classifier():
     """
-    Intelligently map original data type to appropriate Modbus data type
-    
-    Args:
-        original_type: Original data type from data store
-        units: Units string for additional context
-        
-    Returns:
-        Appropriate Modbus data type
+    Generate the type classifier as straight-line code at import time.
+
+    The search callables and the exact-match table are bound into the exec
+    namespace, so the compiled body maps (lowercased) original_type and
+    units to a Modbus data type without any global lookups. Rules: exact
+    type match when no units are given, then the measurement keywords
+    (float32), booleans and percentage ints (int16), other ints (int32),
+    floats (float32), strings (string8), int16 otherwise.
     """
-    original_type = original_type.lower()
-    units = units.lower()
-    
-    # Temperature sensors - use float32 for precision
-    if 'temp' in original_type or '°c' in units or '°f' in units:
-        return 'float32'
-    
-    # Pressure sensors - use float32 for precision  
-    if 'pressure' in original_type or 'hpa' in units or 'bar' in units or 'psi' in units:
-        return 'float32'
-    
-    # Flow rates - use float32 for precision
-    if 'flow' in original_type or 'l/min' in units or 'm3/h' in units:
-        return 'float32'
-    
-    # Vibration - use float32 for precision
-    if 'vibrat' in original_type or 'mm/s' in units:
-        return 'float32'
-    
-    # Power consumption - use float32 for precision
-    if 'power' in original_type or 'kw' in units or 'w' in units:
-        return 'float32'
-    
-    # Boolean values - use single register
-    if original_type == 'bool' or original_type == 'boolean':
-        return 'int16'
-    
-    # Integer values
-    if original_type == 'int' or original_type == 'integer':
-        # Check if it's a percentage (0-100)
-        if 'position' in original_type or '%' in units:
-            return 'int16'
-        # Check if it's a status code
-        elif 'status' in original_type or 'code' in original_type or 'alarm' in original_type:
-            return 'int16'
-        else:
-            return 'int32'
-    
-    # Float values - use float32 for precision
-    if original_type == 'float' or original_type == 'double':
-        return 'float32'
-    
-    # String values - use multiple registers (4 registers = 8 bytes)
-    if original_type == 'string' or original_type == 'str':
-        return 'string8'
-    
-    # Default to int16 for unknown types
-    return 'int16'
+    ns = {
+        '_exact_get': _EXACT_TYPES.get,
+        '_name_search': _MEASUREMENT_NAME_RE.search,
+        '_units_search': _MEASUREMENT_UNITS_RE.search,
+    }
+    src = (
+        'def classify(original_type, units=""):\n'
+        '    if not units:\n'
+        '        hit = _exact_get(original_type)\n'
+        '        if hit:\n'
+        '            return hit\n'
+        '    if _name_search(original_type) or _units_search(units):\n'
+        "        return 'float32'\n"
+        "    if original_type in ('bool', 'boolean'):\n"
+        "        return 'int16'\n"
+        "    if original_type in ('int', 'integer'):\n"
+        "        return 'int16' if '%' in units else 'int32'\n"
+        "    if original_type in ('float', 'double'):\n"
+        "        return 'float32'\n"
+        "    if original_type in ('string', 'str'):\n"
+        "        return 'string8'\n"
+        "    return 'int16'\n"
+    )
+    exec(compile(src, '<modbus_classifier>', 'exec'), ns)
+    return ns['classify']
+
+
+_map_to_modbus_data_type = lru_cache(maxsize=1024)(_build_modbus_classifier())
+
+
+# Registers needed per data type; shared constant instead of a per-call dict
+_REGISTER_COUNTS = {
+    'int16': 1,
+    'uint16': 1,
+    'int32': 2,
+    'uint32': 2,
+    'float32': 2,
+    'string8': 4,  # 8 bytes = 4 registers
+    'string16': 8,  # 16 bytes = 8 registers
+    'bool': 1
+}
 
 
 def _get_register_count(modbus_data_type: str) -> int:
@@ -81,17 +139,28 @@ def _get_register_count(modbus_data_type: str) -> int:
     Returns:
         Number of registers required
     """
-    register_counts = {
-        'int16': 1,
-        'uint16': 1,
-        'int32': 2,
-        'uint32': 2,
-        'float32': 2,
-        'string8': 4,  # 8 bytes = 4 registers
-        'string16': 8,  # 16 bytes = 8 registers
-        'bool': 1
-    }
-    return register_counts.get(modbus_data_type, 1)
+    return _REGISTER_COUNTS.get(modbus_data_type, 1)
+
+
+# Type-specific address ranges for better organization, compiled once into
+# an integer type code plus a tuple-indexed range table
+_TYPE_CODES = {
+    'float32': 0,     # Floating point values
+    'int32': 1,       # 32-bit integers
+    'int16': 2,       # 16-bit integers
+    'string8': 3,     # String values
+    'string16': 4,    # Long strings
+    'bool': 5         # Boolean values
+}
+_TYPE_RANGES = (
+    (40001, 41000), (41001, 42000), (42001, 43000),
+    (43001, 44000), (44001, 45000), (45001, 46000)
+)
+_DEFAULT_RANGE = (40001, 50000)
+
+# Stored verbatim on every generated mapping; %-formatting avoids the
+# per-row f-string compile-and-join overhead on large batches
+_DESCRIPTION_TEMPLATE = 'Auto-generated for %s (%s)'
 
 
 def _allocate_address_by_type(current_address: int, data_type: str, register_count: int) -> int:
@@ -106,28 +175,59 @@ def _allocate_address_by_type(current_address: int, data_type: str, register_cou
     Returns:
         Allocated starting address
     """
-    # Define type-specific address ranges for better organization
-    type_ranges = {
-        'float32': (40001, 41000),    # Floating point values
-        'int32': (41001, 42000),      # 32-bit integers
-        'int16': (42001, 43000),      # 16-bit integers
-        'string8': (43001, 44000),    # String values
-        'string16': (44001, 45000),   # Long strings
-        'bool': (45001, 46000)        # Boolean values
-    }
-    
-    start_range, end_range = type_ranges.get(data_type, (40001, 50000))
-    
-    # Ensure we don't exceed the range
-    if current_address + register_count > end_range:
-        # Move to next available range
-        return start_range
-    
-    # Add padding between different data types
-    if current_address < start_range:
-        return start_range
-    
-    return current_address
+    code = _TYPE_CODES.get(data_type, -1)
+    start_range, end_range = _TYPE_RANGES[code] if code >= 0 else _DEFAULT_RANGE
+
+    # Clamp up into the type's range, wrapping to its start on overflow
+    address = max(current_address, start_range)
+    return start_range if address + register_count > end_range else address
+
+
+def _classify_and_allocate(rows, start_address: int, padding_strategy: str):
+    """
+    Batch kernel for the bulk generator: classify every prefetched row and
+    allocate register addresses in one tight pass
+
+    Args:
+        rows: Prefetched (key, data_type, units, type_lower, units_lower)
+            tuples (None for missing ids)
+        start_address: Starting address for allocation
+        padding_strategy: 'data_type' or 'sequential'
+
+    Returns:
+        Tuple of parallel columns (types, addresses, register_counts) plus
+        the address following the last allocation
+    """
+    types = []
+    addresses = []
+    reg_counts = []
+    current_address = start_address
+    by_type = padding_strategy == 'data_type'
+    # Bind hot callables to locals to avoid repeated global lookups
+    classify = _map_to_modbus_data_type
+    register_count_for = _get_register_count
+    allocate = _allocate_address_by_type
+
+    for i, row in enumerate(rows):
+        if row is None:
+            types.append(None)
+            addresses.append(0)
+            reg_counts.append(0)
+            continue
+
+        _key, _original_data_type, _units, type_l, units_l = row
+        data_type = classify(type_l, units_l)
+        register_count = register_count_for(data_type)
+        if by_type:
+            current_address = allocate(current_address, data_type, register_count)
+        else:
+            current_address = start_address + (i * register_count)
+        types.append(data_type)
+        addresses.append(current_address)
+        reg_counts.append(register_count)
+        current_address += register_count
+
+    return types, addresses, reg_counts, current_address
 
 
 def auto_generate_modbus_mappings(
@@ -154,85 +254,92 @@ def auto_generate_modbus_mappings(
     """
     results = []
     errors = []
-    current_address = start_address
-    
-    # Get detailed data store info for smart type detection
-    detailed_snapshot = DATA_STORE.detailed_snapshot()
-    
-    for i, data_id in enumerate(data_ids):
+    successful = 0
+    failed = 0
+    pending_mappings = []
+
+    # Get detailed data store info for smart type detection. Small batches
+    # fetch only the requested rows; larger ones reuse the cached full
+    # snapshot (kept current while the store version is unchanged)
+    if len(data_ids) * 4 < len(DATA_STORE):
+        detailed_snapshot = DATA_STORE.get_details_by_ids(data_ids)
+    else:
+        detailed_snapshot = _current_snapshot()
+
+    # Reverse id -> key index so each lookup is O(1) instead of scanning
+    # the whole snapshot per data_id
+    id_to_key = DATA_STORE._id_to_key
+
+    # Prefetch (key, data_type, units) columns in one pass so the hot loop
+    # below works on plain tuples instead of re-hashing dict fields per row
+    rows = []
+    for data_id in data_ids:
+        key = id_to_key.get(data_id)
+        data_point = detailed_snapshot.get(key) if key else None
+        if data_point is None:
+            rows.append(None)
+        else:
+            data_type = data_point['data_type']
+            units = data_point.get('units', '')
+            # Lowercase once here so the classifier never re-allocates
+            rows.append((key, data_type, units, data_type.lower(), units.lower()))
+
+    # Classify and allocate all rows in one pass; the loop below only packs
+    # result dicts and stores the mappings
+    type_col, address_col, count_col, current_address = _classify_and_allocate(
+        rows, start_address, padding_strategy
+    )
+
+    for data_id, row, modbus_data_type, register_address, register_count in zip(
+            data_ids, rows, type_col, address_col, count_col):
         try:
-            # Find the data point by ID
-            data_point = None
-            for key, info in detailed_snapshot.items():
-                if DATA_STORE._key_to_id.get(key) == data_id:
-                    data_point = info
-                    break
-            
-            if not data_point:
+            if row is None:
                 errors.append(f"Data ID {data_id} not found in data store")
-                results.append({
-                    'data_id': data_id,
-                    'ok': False,
-                    'error': 'Data ID not found'
-                })
+                results.append(_MappingResult(data_id, False, 'Data ID not found'))
+                failed += 1
                 continue
-            
-            key = data_point['key']
-            original_data_type = data_point['data_type']
-            units = data_point.get('units', '')
-            
-            # Smart Modbus data type mapping
-            modbus_data_type = _map_to_modbus_data_type(original_data_type, units)
-            
-            # Calculate register count based on data type
-            register_count = _get_register_count(modbus_data_type)
-            
-            # Smart address allocation
-            if padding_strategy == 'data_type':
-                # Group by data type and allocate ranges
-                current_address = _allocate_address_by_type(
-                    current_address, modbus_data_type, register_count
-                )
-            else:
-                # Sequential allocation
-                current_address = start_address + (i * register_count)
-            
-            # Create mapping
-            MODBUS_MAPPING.set_mapping(
-                data_id, key, current_address, function_code,
-                modbus_data_type, access, 1.0, endianess,
-                f"Auto-generated for {key} ({original_data_type})"
-            )
-            
-            results.append({
-                'data_id': data_id,
-                'key': key,
-                'register_address': current_address,
+
+            key, original_data_type, units, _type_l, _units_l = row
+
+            # Queue mapping; all rows are stored under one lock after the loop
+            pending_mappings.append((data_id, key, {
+                'register_address': register_address,
+                'function_code': function_code,
                 'data_type': modbus_data_type,
-                'register_count': register_count,
-                'original_data_type': original_data_type,
-                'units': units,
-                'ok': True
-            })
-            
-            # Move to next address
-            current_address += register_count
-            
+                'access': access,
+                'scaling_factor': 1.0,
+                'endianess': endianess,
+                'description': _DESCRIPTION_TEMPLATE % (key, original_data_type)
+            }))
+
+            results.append(_MappingResult(
+                data_id, True, None, key, register_address, modbus_data_type,
+                register_count, original_data_type, units
+            ))
+            successful += 1
+
         except Exception as e:
             errors.append(f"Error processing {data_id}: {str(e)}")
-            results.append({
-                'data_id': data_id,
-                'ok': False,
-                'error': str(e)
-            })
-    
+            results.append(_MappingResult(data_id, False, str(e)))
+            failed += 1
+
+    # Store all generated mappings in one locked batch
+    if pending_mappings:
+        MODBUS_MAPPING.set_mappings_bulk(pending_mappings)
+
     return {
         'ok': len(errors) == 0,
         'total_requested': len(data_ids),
-        'successful': len([r for r in results if r.get('ok')]),
-        'failed': len([r for r in results if not r.get('ok')]),
-        'results': results,
+        'successful': successful,
+        'failed': failed,
+        'results': [r.to_dict() for r in results],
         'errors': errors,
+        # Batch-constant attributes are reported once instead of per row
+        'common': {
+            'function_code': function_code,
+            'access': access,
+            'endianess': endianess
+        },
         'address_range': {
             'start': start_address,
             'end': current_address - 1,
@@ -241,14 +348,9 @@ def auto_generate_modbus_mappings(
     }
 
 
-def get_modbus_data_types() -> Dict[str, Dict[str, Any]]:
-    """
-    Get information about supported Modbus data types
-    
-    Returns:
-        Dictionary with data type information
-    """
-    return {
+# Static reference table shared across calls; built once at import so the
+# info endpoint doesn't rebuild a large constant dict per request
+_MODBUS_DATA_TYPES = {
         'int16': {
             'description': '16-bit signed integer',
             'registers': 1,
@@ -292,3 +394,13 @@ def get_modbus_data_types() -> Dict[str, Dict[str, Any]]:
             'use_cases': ['Longer text', 'Descriptions']
         }
     }
+
+
+def get_modbus_data_types() -> Dict[str, Dict[str, Any]]:
+    """
+    Get information about supported Modbus data types
+    
+    Returns:
+        Dictionary with data type information
+    """
+    return _MODBUS_DATA_TYPES
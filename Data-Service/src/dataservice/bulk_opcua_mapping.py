@@ -5,174 +5,196 @@ Provides intelligent bulk mapping generation for OPC-UA protocol
 with smart node ID allocation and data type detection.
 """
 
+import re
+
+from functools import lru_cache
 from typing import List, Dict, Any, Optional
 from .core.datastore import DATA_STORE
 from .core.mapping_store import OPCUA_MAPPING
 
 
+# Substring needles driving the classification rules below. Every
+# measurement category (temperature, pressure, flow, vibration, power)
+# maps to Double, so their needles collapse into shared alternations that
+# the compiled patterns scan in a single pass instead of one `in` test
+# per literal per call.
+_MEASUREMENT_NAME_NEEDLES = ('temp', 'pressure', 'flow', 'vibrat', 'power')
+_MEASUREMENT_UNITS_NEEDLES = ('°c', '°f', 'hpa', 'bar', 'psi', 'l/min', 'm3/h', 'mm/s', 'kw', 'w')
+_STATUS_NAME_NEEDLES = ('status', 'enabled', 'motor')
+_SMALL_INT_NAME_NEEDLES = ('position', 'code', 'alarm')
+_CONTROL_NAME_NEEDLES = ('status', 'enabled', 'motor', 'position', 'valve')
+
+_MEASUREMENT_NAME_RE = re.compile('|'.join(map(re.escape, _MEASUREMENT_NAME_NEEDLES)))
+_MEASUREMENT_UNITS_RE = re.compile('|'.join(map(re.escape, _MEASUREMENT_UNITS_NEEDLES)))
+_STATUS_NAME_RE = re.compile('|'.join(map(re.escape, _STATUS_NAME_NEEDLES)))
+_SMALL_INT_NAME_RE = re.compile('|'.join(map(re.escape, _SMALL_INT_NAME_NEEDLES)))
+_CONTROL_NAME_RE = re.compile('|'.join(map(re.escape, _CONTROL_NAME_NEEDLES)))
+
+
+@lru_cache(maxsize=4096)
 def _map_to_opcua_data_type(original_type: str, units: str = "", key_name: str = "") -> str:
     """
     Intelligently map original data type to appropriate OPC-UA data type
     
     Args:
-        original_type: Original data type from data store
-        units: Units string for additional context
-        key_name: Key name for additional context
-        
+        original_type: Original data type from data store, lowercased
+        units: Units string for additional context, lowercased
+        key_name: Key name for additional context, lowercased
+
     Returns:
         Appropriate OPC-UA data type
     """
-    original_type = original_type.lower()
-    units = units.lower()
-    key_name = key_name.lower()
-    
-    # Temperature measurements - use Double for precision
-    if 'temp' in original_type or 'temp' in key_name or '°c' in units or '°f' in units:
-        return 'Double'
-    
-    # Pressure measurements - use Double for precision
-    if 'pressure' in original_type or 'pressure' in key_name or 'hpa' in units or 'bar' in units or 'psi' in units:
-        return 'Double'
-    
-    # Flow rate measurements - use Double for precision
-    if 'flow' in original_type or 'flow' in key_name or 'l/min' in units or 'm3/h' in units:
+    # Measurements (temperature, pressure, flow, vibration, power) - use
+    # Double for precision
+    if (_MEASUREMENT_NAME_RE.search(original_type) or
+            _MEASUREMENT_NAME_RE.search(key_name) or
+            _MEASUREMENT_UNITS_RE.search(units)):
         return 'Double'
-    
-    # Vibration measurements - use Double for precision
-    if 'vibrat' in original_type or 'vibrat' in key_name or 'mm/s' in units:
-        return 'Double'
-    
-    # Power measurements - use Double for precision
-    if 'power' in original_type or 'power' in key_name or 'kw' in units or 'w' in units:
-        return 'Double'
-    
+
     # Boolean/Status values - use Boolean
-    if (original_type == 'bool' or original_type == 'boolean' or 
-        'status' in key_name or 'enabled' in key_name or 'motor' in key_name):
+    if original_type in ('bool', 'boolean') or _STATUS_NAME_RE.search(key_name):
         return 'Boolean'
-    
+
     # Integer values - use appropriate integer type
-    if original_type == 'int' or original_type == 'integer':
-        # Check if it's a percentage (0-100) or small integer
-        if 'position' in key_name or '%' in units or 'code' in key_name or 'alarm' in key_name:
+    if original_type in ('int', 'integer'):
+        # Percentages (0-100) and small integers fit Int16
+        if '%' in units or _SMALL_INT_NAME_RE.search(key_name):
             return 'Int16'
-        else:
-            return 'Int32'
-    
+        return 'Int32'
+
     # Float values - use Double for precision
-    if original_type == 'float' or original_type == 'double':
+    if original_type in ('float', 'double'):
         return 'Double'
-    
+
     # String values - use String
-    if original_type == 'string' or original_type == 'str':
+    if original_type in ('string', 'str'):
         return 'String'
-    
+
     # Default to Double for unknown types
     return 'Double'
 
 
+@lru_cache(maxsize=4096)
 def _get_opcua_access_level(data_type: str, key_name: str = "") -> str:
     """
     Get appropriate access level for OPC-UA data type
     
     Args:
         data_type: OPC-UA data type
-        key_name: Key name for context
-        
+        key_name: Key name for context, lowercased
+
     Returns:
         Access level string
     """
-    key_name = key_name.lower()
-    
     # Status/Control values - read-write
-    if ('status' in key_name or 'enabled' in key_name or 'motor' in key_name or 
-        'position' in key_name or 'valve' in key_name):
+    if _CONTROL_NAME_RE.search(key_name):
         return 'CurrentReadOrWrite'
-    
+
     # Measurements - read-only
-    if ('temp' in key_name or 'pressure' in key_name or 'flow' in key_name or 
-        'vibrat' in key_name or 'power' in key_name):
+    if _MEASUREMENT_NAME_RE.search(key_name):
         return 'CurrentRead'
-    
+
     # Default to read-write for flexibility
     return 'CurrentReadOrWrite'
 
 
+@lru_cache(maxsize=4096)
 def _get_opcua_timestamps(data_type: str, key_name: str = "") -> str:
     """
     Get appropriate timestamp setting for OPC-UA data type
     
     Args:
         data_type: OPC-UA data type
-        key_name: Key name for context
-        
+        key_name: Key name for context, lowercased
+
     Returns:
         Timestamp setting string
     """
-    key_name = key_name.lower()
-    
     # Measurements - both server and source timestamps
-    if ('temp' in key_name or 'pressure' in key_name or 'flow' in key_name or 
-        'vibrat' in key_name or 'power' in key_name):
+    if _MEASUREMENT_NAME_RE.search(key_name):
         return 'Both'
-    
+
     # Status values - server timestamp
-    if ('status' in key_name or 'enabled' in key_name or 'motor' in key_name):
+    if _STATUS_NAME_RE.search(key_name):
         return 'Server'
-    
+
     # Default to both
     return 'Both'
 
 
-def _allocate_node_id_by_type(current_node_id: int, data_type: str, key_name: str = "", namespace: int = 2) -> int:
+# Type-specific node ID ranges for better organization
+_TYPE_RANGES = {
+    "Double": (100, 200),      # Floating point measurements
+    "Int32": (200, 300),       # 32-bit integers
+    "Int16": (300, 400),       # 16-bit integers
+    "Boolean": (400, 500),     # Boolean values
+    "String": (500, 600),      # String values
+    "Float": (600, 700),       # Float values
+    "Byte": (700, 800),        # Byte values
+    "SByte": (800, 900)        # Signed byte values
+}
+_DEFAULT_RANGE = (100, 1000)
+
+# The bitmap below spans the allocator's whole search space (0-1000)
+_NODE_ID_SPACE = 1001
+
+# Compiled "ns=<namespace>;i=<num>" matchers, one per namespace seen
+_NS_NODEID_RE_CACHE: Dict[int, Any] = {}
+
+
+def _ns_nodeid_re(namespace: int):
+    """Get the compiled node-ID pattern for a namespace (cached)"""
+    pattern = _NS_NODEID_RE_CACHE.get(namespace)
+    if pattern is None:
+        pattern = _NS_NODEID_RE_CACHE[namespace] = re.compile(rf"^ns={namespace};i=(\d+)$")
+    return pattern
+
+
+def _used_node_ids(namespace: int) -> bytearray:
+    """
+    Parse the numeric node IDs already mapped in a namespace
+
+    Args:
+        namespace: OPC-UA namespace
+
+    Returns:
+        Bitmap (bytearray) where byte i is 1 when node ID i is in use;
+        a free ID can then be found with a C-level bytearray.index scan
+    """
+    match = _ns_nodeid_re(namespace).match
+    used = bytearray(_NODE_ID_SPACE)
+    for mapping in OPCUA_MAPPING.all().values():
+        m = match(mapping.get("node_id", ""))
+        if m:
+            node_num = int(m.group(1))
+            if node_num < _NODE_ID_SPACE:
+                used[node_num] = 1
+    return used
+
+
+def _allocate_node_id_by_type(current_node_id: int, data_type: str, used_node_ids: bytearray) -> int:
     """
     Smart node ID allocation that groups by data type and avoids conflicts
-    
+
     Args:
         current_node_id: Current node ID position
         data_type: OPC-UA data type
-        key_name: Key name for context
-        namespace: OPC-UA namespace
-        
+        used_node_ids: Bitmap of node IDs already in use (see
+            _used_node_ids); the caller marks each allocated ID so the
+            bitmap stays current across a bulk run
+
     Returns:
         Allocated node ID that does not conflict with existing mappings
     """
-    # Define type-specific node ID ranges for better organization
-    type_ranges = {
-        "Double": (100, 200),      # Floating point measurements
-        "Int32": (200, 300),       # 32-bit integers
-        "Int16": (300, 400),       # 16-bit integers
-        "Boolean": (400, 500),     # Boolean values
-        "String": (500, 600),      # String values
-        "Float": (600, 700),       # Float values
-        "Byte": (700, 800),        # Byte values
-        "SByte": (800, 900)        # Signed byte values
-    }
-    
-    start_range, end_range = type_ranges.get(data_type, (100, 1000))
-    
-    # Get all existing mappings to check for conflicts
-    existing_mappings = OPCUA_MAPPING.all()
-    used_node_ids = set()
-    
-    for mapping in existing_mappings.values():
-        node_id_str = mapping.get("node_id", "")
-        if node_id_str.startswith(f"ns={namespace};i="):
-            try:
-                node_num = int(node_id_str.split("i=")[1])
-                if start_range <= node_num <= end_range:
-                    used_node_ids.add(node_num)
-            except (ValueError, IndexError):
-                continue
-    
+    start_range, end_range = _TYPE_RANGES.get(data_type, _DEFAULT_RANGE)
+
     # Find next available ID starting from the appropriate range
     search_start = max(current_node_id, start_range)
-    for candidate_id in range(search_start, end_range + 1):
-        if candidate_id not in used_node_ids:
-            return candidate_id
-    
-    # If no available ID in range, return start of range (should handle overflow)
-    return start_range
+    try:
+        return used_node_ids.index(0, search_start, end_range + 1)
+    except ValueError:
+        # No available ID in range, return start of range (should handle overflow)
+        return start_range
 
 
 def auto_generate_opcua_mappings(
@@ -201,22 +223,34 @@ def auto_generate_opcua_mappings(
     """
     results = []
     errors = []
+    successful = 0
+    failed = 0
     current_node_id = start_node_id
-    
+    # Loop-invariant result fields, copied into each success row
+    base_row = {
+        'value_rank': value_rank,
+        'namespace': start_namespace,
+        'ok': True
+    }
+
     # Get detailed data store info for smart type detection
     detailed_snapshot = DATA_STORE.detailed_snapshot()
-    
+    # Resolve each requested ID through the store's reverse index instead
+    # of scanning the whole snapshot per data_id
+    id_to_key = DATA_STORE._id_to_key
+    # Parse existing node IDs once; newly allocated IDs are added below so
+    # allocation never rescans the mapping table mid-run
+    used_node_ids = _used_node_ids(start_namespace)
+
     for i, data_id in enumerate(data_ids):
         try:
             # Find the data point by ID
-            data_point = None
-            for key, info in detailed_snapshot.items():
-                if DATA_STORE._key_to_id.get(key) == data_id:
-                    data_point = info
-                    break
-            
+            key = id_to_key.get(data_id)
+            data_point = detailed_snapshot.get(key) if key else None
+
             if not data_point:
                 errors.append(f"Data ID {data_id} not found in data store")
+                failed += 1
                 results.append({
                     'data_id': data_id,
                     'ok': False,
@@ -227,27 +261,32 @@ def auto_generate_opcua_mappings(
             key = data_point['key']
             original_data_type = data_point['data_type']
             units = data_point.get('units', '')
-            
+            # Lowercase once per row; the helpers take pre-lowered
+            # strings so their cache keys are canonical
+            key_lc = key.lower()
+
             # Smart OPC-UA data type mapping
-            opcua_data_type = _map_to_opcua_data_type(original_data_type, units, key)
+            opcua_data_type = _map_to_opcua_data_type(original_data_type.lower(), units.lower(), key_lc)
             
             # Smart node ID allocation
             if padding_strategy == 'data_type':
                 # Group by data type and allocate ranges
-                current_node_id = _allocate_node_id_by_type(current_node_id, opcua_data_type, key, start_namespace)
+                current_node_id = _allocate_node_id_by_type(current_node_id, opcua_data_type, used_node_ids)
             else:
                 # Sequential allocation
                 current_node_id = start_node_id + i
+            if current_node_id < _NODE_ID_SPACE:
+                used_node_ids[current_node_id] = 1
             
             # Determine access level
             if access_level == 'auto':
-                determined_access = _get_opcua_access_level(opcua_data_type, key)
+                determined_access = _get_opcua_access_level(opcua_data_type, key_lc)
             else:
                 determined_access = access_level
             
             # Determine timestamps
             if timestamps == 'auto':
-                determined_timestamps = _get_opcua_timestamps(opcua_data_type, key)
+                determined_timestamps = _get_opcua_timestamps(opcua_data_type, key_lc)
             else:
                 determined_timestamps = timestamps
             
@@ -264,6 +303,7 @@ def auto_generate_opcua_mappings(
                 f"Auto-generated for {key} ({original_data_type})"
             )
             
+            successful += 1
             results.append({
                 'data_id': data_id,
                 'key': key,
@@ -273,11 +313,9 @@ def auto_generate_opcua_mappings(
                 'data_type': opcua_data_type,
                 'access_level': determined_access,
                 'timestamps': determined_timestamps,
-                'value_rank': value_rank,
-                'namespace': start_namespace,
                 'original_data_type': original_data_type,
                 'units': units,
-                'ok': True
+                **base_row
             })
             
             # Move to next node ID
@@ -285,6 +323,7 @@ def auto_generate_opcua_mappings(
             
         except Exception as e:
             errors.append(f"Error processing {data_id}: {str(e)}")
+            failed += 1
             results.append({
                 'data_id': data_id,
                 'ok': False,
@@ -294,8 +333,8 @@ def auto_generate_opcua_mappings(
     return {
         'ok': len(errors) == 0,
         'total_requested': len(data_ids),
-        'successful': len([r for r in results if r.get('ok')]),
-        'failed': len([r for r in results if not r.get('ok')]),
+        'successful': successful,
+        'failed': failed,
         'results': results,
         'errors': errors,
         'node_range': {
@@ -307,6 +346,120 @@ def auto_generate_opcua_mappings(
     }
 
 
+# Static reference tables; built once at import so the getters hand back
+# the shared objects instead of re-allocating the literals per call
+_OPCUA_DATA_TYPES = {
+    'Boolean': {
+        'description': 'Boolean value (true/false)',
+        'use_cases': ['Status', 'On/Off', 'Enabled/Disabled'],
+        'node_range': '400-499',
+        'size': '1 bit'
+    },
+    'SByte': {
+        'description': 'Signed 8-bit integer',
+        'use_cases': ['Small counters', 'Status codes'],
+        'node_range': '800-899',
+        'size': '1 byte'
+    },
+    'Byte': {
+        'description': 'Unsigned 8-bit integer',
+        'use_cases': ['Small positive values', 'Flags'],
+        'node_range': '700-799',
+        'size': '1 byte'
+    },
+    'Int16': {
+        'description': 'Signed 16-bit integer',
+        'use_cases': ['Percentages', 'Small measurements', 'Status codes'],
+        'node_range': '300-399',
+        'size': '2 bytes'
+    },
+    'UInt16': {
+        'description': 'Unsigned 16-bit integer',
+        'use_cases': ['Counters', 'Positive values'],
+        'node_range': '300-399',
+        'size': '2 bytes'
+    },
+    'Int32': {
+        'description': 'Signed 32-bit integer',
+        'use_cases': ['Large counters', 'Timestamps', 'IDs'],
+        'node_range': '200-299',
+        'size': '4 bytes'
+    },
+    'UInt32': {
+        'description': 'Unsigned 32-bit integer',
+        'use_cases': ['Large positive values', 'Timestamps'],
+        'node_range': '200-299',
+        'size': '4 bytes'
+    },
+    'Int64': {
+        'description': 'Signed 64-bit integer',
+        'use_cases': ['Very large counters', 'Precise timestamps'],
+        'node_range': '200-299',
+        'size': '8 bytes'
+    },
+    'UInt64': {
+        'description': 'Unsigned 64-bit integer',
+        'use_cases': ['Very large positive values'],
+        'node_range': '200-299',
+        'size': '8 bytes'
+    },
+    'Float': {
+        'description': '32-bit floating point',
+        'use_cases': ['Basic measurements', 'Simple calculations'],
+        'node_range': '600-699',
+        'size': '4 bytes'
+    },
+    'Double': {
+        'description': '64-bit floating point',
+        'use_cases': ['Precise measurements', 'Temperature', 'Pressure', 'Flow'],
+        'node_range': '100-199',
+        'size': '8 bytes'
+    },
+    'String': {
+        'description': 'Unicode string',
+        'use_cases': ['Text', 'Descriptions', 'Messages'],
+        'node_range': '500-599',
+        'size': 'Variable'
+    },
+    'DateTime': {
+        'description': 'Date and time',
+        'use_cases': ['Timestamps', 'Scheduling'],
+        'node_range': '900-999',
+        'size': '8 bytes'
+    },
+    'Guid': {
+        'description': 'Globally unique identifier',
+        'use_cases': ['Unique IDs', 'References'],
+        'node_range': '900-999',
+        'size': '16 bytes'
+    },
+    'ByteString': {
+        'description': 'Byte array',
+        'use_cases': ['Binary data', 'Images', 'Files'],
+        'node_range': '500-599',
+        'size': 'Variable'
+    }
+}
+
+_OPCUA_ACCESS_LEVELS = {
+    'CurrentRead': 'Read-only access to current value',
+    'CurrentWrite': 'Write-only access to current value',
+    'CurrentReadOrWrite': 'Read and write access to current value',
+    'HistoryRead': 'Read access to historical data',
+    'HistoryWrite': 'Write access to historical data',
+    'SemanticChange': 'Access to semantic changes',
+    'StatusWrite': 'Write access to status information',
+    'TimestampWrite': 'Write access to timestamp information'
+}
+
+_OPCUA_TIMESTAMPS = {
+    'None': 'No timestamps',
+    'Server': 'Server timestamp only',
+    'Source': 'Source timestamp only',
+    'Both': 'Both server and source timestamps'
+}
+
+
 def get_opcua_data_types() -> Dict[str, Dict[str, Any]]:
     """
     Get information about supported OPC-UA data types
@@ -314,98 +467,7 @@ def get_opcua_data_types() -> Dict[str, Dict[str, Any]]:
     Returns:
         Dictionary with OPC-UA data type information
     """
-    return {
-        'Boolean': {
-            'description': 'Boolean value (true/false)',
-            'use_cases': ['Status', 'On/Off', 'Enabled/Disabled'],
-            'node_range': '400-499',
-            'size': '1 bit'
-        },
-        'SByte': {
-            'description': 'Signed 8-bit integer',
-            'use_cases': ['Small counters', 'Status codes'],
-            'node_range': '800-899',
-            'size': '1 byte'
-        },
-        'Byte': {
-            'description': 'Unsigned 8-bit integer',
-            'use_cases': ['Small positive values', 'Flags'],
-            'node_range': '700-799',
-            'size': '1 byte'
-        },
-        'Int16': {
-            'description': 'Signed 16-bit integer',
-            'use_cases': ['Percentages', 'Small measurements', 'Status codes'],
-            'node_range': '300-399',
-            'size': '2 bytes'
-        },
-        'UInt16': {
-            'description': 'Unsigned 16-bit integer',
-            'use_cases': ['Counters', 'Positive values'],
-            'node_range': '300-399',
-            'size': '2 bytes'
-        },
-        'Int32': {
-            'description': 'Signed 32-bit integer',
-            'use_cases': ['Large counters', 'Timestamps', 'IDs'],
-            'node_range': '200-299',
-            'size': '4 bytes'
-        },
-        'UInt32': {
-            'description': 'Unsigned 32-bit integer',
-            'use_cases': ['Large positive values', 'Timestamps'],
-            'node_range': '200-299',
-            'size': '4 bytes'
-        },
-        'Int64': {
-            'description': 'Signed 64-bit integer',
-            'use_cases': ['Very large counters', 'Precise timestamps'],
-            'node_range': '200-299',
-            'size': '8 bytes'
-        },
-        'UInt64': {
-            'description': 'Unsigned 64-bit integer',
-            'use_cases': ['Very large positive values'],
-            'node_range': '200-299',
-            'size': '8 bytes'
-        },
-        'Float': {
-            'description': '32-bit floating point',
-            'use_cases': ['Basic measurements', 'Simple calculations'],
-            'node_range': '600-699',
-            'size': '4 bytes'
-        },
-        'Double': {
-            'description': '64-bit floating point',
-            'use_cases': ['Precise measurements', 'Temperature', 'Pressure', 'Flow'],
-            'node_range': '100-199',
-            'size': '8 bytes'
-        },
-        'String': {
-            'description': 'Unicode string',
-            'use_cases': ['Text', 'Descriptions', 'Messages'],
-            'node_range': '500-599',
-            'size': 'Variable'
-        },
-        'DateTime': {
-            'description': 'Date and time',
-            'use_cases': ['Timestamps', 'Scheduling'],
-            'node_range': '900-999',
-            'size': '8 bytes'
-        },
-        'Guid': {
-            'description': 'Globally unique identifier',
-            'use_cases': ['Unique IDs', 'References'],
-            'node_range': '900-999',
-            'size': '16 bytes'
-        },
-        'ByteString': {
-            'description': 'Byte array',
-            'use_cases': ['Binary data', 'Images', 'Files'],
-            'node_range': '500-599',
-            'size': 'Variable'
-        }
-    }
+    return _OPCUA_DATA_TYPES
 
 
 def get_opcua_access_levels() -> Dict[str, str]:
@@ -415,16 +477,7 @@ def get_opcua_access_levels() -> Dict[str, str]:
     Returns:
         Dictionary with access level descriptions
     """
-    return {
-        'CurrentRead': 'Read-only access to current value',
-        'CurrentWrite': 'Write-only access to current value',
-        'CurrentReadOrWrite': 'Read and write access to current value',
-        'HistoryRead': 'Read access to historical data',
-        'HistoryWrite': 'Write access to historical data',
-        'SemanticChange': 'Access to semantic changes',
-        'StatusWrite': 'Write access to status information',
-        'TimestampWrite': 'Write access to timestamp information'
-    }
+    return _OPCUA_ACCESS_LEVELS
 
 
 def get_opcua_timestamps() -> Dict[str, str]:
@@ -434,9 +487,4 @@ def get_opcua_timestamps() -> Dict[str, str]:
     Returns:
         Dictionary with timestamp descriptions
     """
-    return {
-        'None': 'No timestamps',
-        'Server': 'Server timestamp only',
-        'Source': 'Source timestamp only',
-        'Both': 'Both server and source timestamps'
-    }
+    return _OPCUA_TIMESTAMPS
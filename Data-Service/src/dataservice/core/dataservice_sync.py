@@ -5,11 +5,39 @@ Syncs IO tag values from polling service to Data-Service using IPC.
 Reads from vista-backend HTTP API and pushes to Data-Service via Unix socket.
 """
 import time
+import queue
+import hashlib
+import logging
 import threading
+from collections import deque
+from functools import cache
+
 import requests
 from typing import Optional, Dict, Any
 from .ipc import IpcClient
 
+# Module logger; handlers are attached lazily in __init__ so messages
+# use logging's deferred %-formatting instead of eager f-strings
+logger = logging.getLogger('dataservice.sync')
+
+# Statuses that mark a polled read as good; frozenset membership is a
+# single hashed lookup in the per-tag hot loop
+_OK_STATUSES = frozenset(("SUCCESS", "success", "ok", "OK"))
+
+# Sentinel distinguishing "never pushed" from a stored None
+_MISSING = object()
+
+# Every this many sync cycles all tags are re-pushed even if unchanged,
+# so the Data-Service recovers state after a restart
+_FULL_RESEND_EVERY = 60
+
+try:
+    # orjson decodes the response bytes directly and is a few times
+    # faster than stdlib json on the nested polled-values payload
+    import orjson
+except ImportError:
+    orjson = None
+
 
 class DataServiceSyncService:
     """
@@ -21,162 +49,313 @@ class DataServiceSyncService:
         socket_path: Optional[str] = None,
         polling_api_url: str = "http://localhost:8000/deploy/api/io/polled-values",
         sync_interval: float = 1.0,
+        max_sync_interval: float = 30.0,
         enable_logging: bool = True
     ):
         """
         Initialize the sync service
-        
+
         Args:
             socket_path: Path to Data-Service IPC socket
             polling_api_url: URL to fetch polled values from vista-backend
             sync_interval: Seconds between sync cycles
+            max_sync_interval: Backoff cap while the payload is unchanged
             enable_logging: Whether to enable logging
         """
         self.ipc_client = IpcClient(socket_path)
         self.polling_api_url = polling_api_url
         self.sync_interval = sync_interval
+        self.max_sync_interval = max_sync_interval
         self.enable_logging = enable_logging
+
+        # Persistent session so keep-alive reuses one TCP connection
+        # across poll cycles instead of reconnecting every sync
+        self._session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=2)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        self._last_etag: Optional[str] = None
+        self._last_payload: Dict[str, Dict[str, Any]] = {}
+        # Digest of the last payload; while it stays the same the sync
+        # loop backs off from sync_interval up to max_sync_interval
+        self._last_digest: Optional[bytes] = None
+        self._payload_changed = True
+        self._current_interval = sync_interval
+        # Set once the IPC server rejects write_many, so the fallback
+        # doesn't retry the batched action every cycle
+        self._ipc_batch_unsupported = False
+        # Last value pushed per key; unchanged tags are skipped
+        self._last_values: Dict[str, Any] = {}
+
+        if enable_logging and not logger.handlers:
+            handler = logging.StreamHandler()
+            handler.setFormatter(logging.Formatter(
+                '%(asctime)s | %(levelname)-8s | %(name)s | %(message)s',
+                datefmt='%H:%M:%S'
+            ))
+            logger.addHandler(handler)
+        logger.setLevel(logging.DEBUG if enable_logging else logging.CRITICAL)
         
         self._sync_thread: Optional[threading.Thread] = None
+        self._fetch_thread: Optional[threading.Thread] = None
         self._stop_event = threading.Event()
+        # Hand-off between the fetch (producer) and write (consumer)
+        # threads; small bound so a stalled consumer applies backpressure
+        self._fetch_queue: queue.Queue = queue.Queue(maxsize=2)
         
-        # Track statistics
+        # Track statistics; errors live in a ring buffer that keeps the
+        # most recent 100 entries instead of freezing at the first 100
         self.stats = {
             'total_syncs': 0,
             'successful_writes': 0,
             'failed_writes': 0,
             'last_sync_time': None,
-            'errors': []
+            'errors': deque(maxlen=100)
         }
     
-    def _log(self, level: str, message: str):
-        """Log message to stdout"""
-        if self.enable_logging:
-            timestamp = time.strftime('%H:%M:%S')
-            print(f"{timestamp} | {level.upper():8} | dataservice.sync | {message}", flush=True)
-    
     def _get_polled_values(self) -> Dict[str, Dict[str, Any]]:
         """Get latest polled values from vista-backend HTTP API"""
         try:
-            response = requests.get(self.polling_api_url, timeout=5)
+            headers = {"If-None-Match": self._last_etag} if self._last_etag else None
+            response = self._session.get(self.polling_api_url, timeout=5, headers=headers)
+            if response.status_code == 304:
+                # Unchanged since last poll - reuse the cached payload
+                self._payload_changed = False
+                return self._last_payload
             response.raise_for_status()
-            return response.json()
+            self._last_etag = response.headers.get("ETag")
+            digest = hashlib.blake2b(response.content, digest_size=8).digest()
+            self._payload_changed = digest != self._last_digest
+            self._last_digest = digest
+            if orjson is not None:
+                self._last_payload = orjson.loads(response.content)
+            else:
+                self._last_payload = response.json()
+            return self._last_payload
         except requests.exceptions.RequestException as e:
-            self._log('error', f"Failed to fetch polled values from API: {e}")
+            logger.error("Failed to fetch polled values from API: %s", e)
             return {}
         except Exception as e:
-            self._log('error', f"Unexpected error fetching polled values: {e}")
+            logger.error("Unexpected error fetching polled values: %s", e)
             return {}
     
-    def _sync_to_dataservice(self):
-        """Main sync loop - continuously sync polled values to Data-Service"""
-        self._log('info', "🔄 Data-Service sync service started")
-        self._log('info', f"   Polling API: {self.polling_api_url}")
-        self._log('info', f"   IPC Socket: {self.ipc_client.socket_path}")
-        self._log('info', f"   Sync Interval: {self.sync_interval}s")
-        
+    def _write_batch(self, batch: Dict[str, Any]) -> tuple:
+        """
+        Push a batch of key/value updates to Data-Service
+
+        Sends everything in a single write_many IPC frame; falls back to
+        per-key writes against servers that predate the batched action.
+
+        Returns:
+            (write_count, error_count) for this batch
+        """
+        write_count = 0
+        error_count = 0
+
+        if not self._ipc_batch_unsupported:
+            try:
+                response = self.ipc_client.write_many(batch)
+                if response.get('ok'):
+                    for full_key, result in (response.get('results') or {}).items():
+                        if result.get('ok'):
+                            write_count += 1
+                            self.stats['successful_writes'] += 1
+                            self._last_values[full_key] = batch[full_key]
+                        else:
+                            error_count += 1
+                            self.stats['failed_writes'] += 1
+                            error_msg = result.get('error', 'Unknown error')
+                            logger.warning("Failed to write %s: %s", full_key, error_msg)
+                    return write_count, error_count
+                if response.get('error') == 'unknown action':
+                    self._ipc_batch_unsupported = True
+                    logger.warning("IPC server does not support write_many, using per-key writes")
+                else:
+                    raise RuntimeError(response.get('error', 'Unknown error'))
+            except Exception as e:
+                if not self._ipc_batch_unsupported:
+                    error_count = len(batch)
+                    self.stats['failed_writes'] += error_count
+                    error_msg = f"Error writing batch of {len(batch)} tags: {str(e)}"
+                    logger.error(error_msg)
+                    self.stats['errors'].append({
+                        'time': time.time(),
+                        'message': error_msg
+                    })
+                    return write_count, error_count
+
+        # Per-key fallback path
+        for full_key, value in batch.items():
+            try:
+                response = self.ipc_client.write(full_key, value)
+                if response.get('ok'):
+                    write_count += 1
+                    self.stats['successful_writes'] += 1
+                    self._last_values[full_key] = value
+                else:
+                    error_count += 1
+                    self.stats['failed_writes'] += 1
+                    error_msg = response.get('error', 'Unknown error')
+                    logger.warning("Failed to write %s: %s", full_key, error_msg)
+            except Exception as e:
+                error_count += 1
+                self.stats['failed_writes'] += 1
+                error_msg = f"Error writing {full_key}: {str(e)}"
+                logger.error(error_msg)
+                self.stats['errors'].append({
+                    'time': time.time(),
+                    'message': error_msg
+                })
+
+        return write_count, error_count
+
+    def _fetch_loop(self):
+        """
+        Producer loop - poll the HTTP API and queue changed payloads
+
+        Owns the fixed-rate schedule and the idle backoff, so the next
+        HTTP fetch can start while the consumer is still pushing the
+        previous batch over IPC.
+        """
+        # Fixed-rate schedule off the monotonic clock, so wall-clock
+        # jumps (NTP) and variable cycle cost don't drift the cadence
+        next_deadline = time.monotonic() + self.sync_interval
+
         while not self._stop_event.is_set():
             try:
-                sync_start = time.time()
-                
-                # Get all current values from polling service via HTTP
                 polled_values = self._get_polled_values()
-                
+
                 if not polled_values:
-                    self._log('debug', "No polled values available from API")
-                    time.sleep(self.sync_interval)
+                    logger.debug("No polled values available from API")
+                    self._stop_event.wait(self.sync_interval)
                     continue
-                
-                write_count = 0
-                error_count = 0
-                
-                # Push each tag to Data-Service
+
+                if not self._payload_changed:
+                    # Identical payload - skip the push and back off until
+                    # the polling service reports something new
+                    self._current_interval = min(self._current_interval * 2, self.max_sync_interval)
+                    self._stop_event.wait(self._current_interval)
+                    continue
+                self._current_interval = self.sync_interval
+
+                # Hand the payload to the consumer; retry while it is
+                # busy so stop requests are still honoured promptly
+                while not self._stop_event.is_set():
+                    try:
+                        self._fetch_queue.put(polled_values, timeout=1.0)
+                        break
+                    except queue.Full:
+                        continue
+
+                # Wait out the rest of the slot, then advance the deadline
+                # by exactly one interval; if a cycle overran, re-anchor
+                # instead of bursting to catch up
+                now = time.monotonic()
+                if next_deadline > now:
+                    self._stop_event.wait(next_deadline - now)
+                    next_deadline += self.sync_interval
+                else:
+                    next_deadline = now + self.sync_interval
+
+            except Exception as e:
+                logger.error("Error in polling fetch loop: %s", e)
+                self._stop_event.wait(5)  # Wait longer on error
+
+    def _sync_to_dataservice(self):
+        """Main sync loop - push queued polled values to Data-Service"""
+        logger.info("🔄 Data-Service sync service started")
+        logger.info("   Polling API: %s", self.polling_api_url)
+        logger.info("   IPC Socket: %s", self.ipc_client.socket_path)
+        logger.info("   Sync Interval: %ss", self.sync_interval)
+
+        while not self._stop_event.is_set():
+            try:
+                try:
+                    polled_values = self._fetch_queue.get(timeout=1.0)
+                except queue.Empty:
+                    continue
+
+                sync_start = time.monotonic()
+
+                # Collect all tag updates, then push them in one IPC frame.
+                # Tags whose value matches the last successful push are
+                # skipped, except on the periodic full resend.
+                last_values = self._last_values
+                force_resend = self.stats['total_syncs'] % _FULL_RESEND_EVERY == 0
+                batch = {}
+                last_get = last_values.get
                 for device_name, tags in polled_values.items():
                     for tag_id, tag_data in tags.items():
-                        tag_name = tag_data.get('tag_name') or tag_data.get('name') or tag_id
-                        value = tag_data.get('value')
-                        status = tag_data.get('status')
-                        
+                        get = tag_data.get
+
                         # Only push successful reads with valid values
-                        if status in ["SUCCESS", "success", "ok", "OK"] and value is not None:
-                            try:
-                                # Use tag_name as the key for Data-Service
-                                # Format: device_name.tag_name for uniqueness
-                                full_key = f"{device_name}:{tag_name}"
-                                
-                                # Write via IPC
-                                response = self.ipc_client.write(full_key, value)
-                                
-                                if response.get('ok'):
-                                    write_count += 1
-                                    self.stats['successful_writes'] += 1
-                                else:
-                                    error_count += 1
-                                    self.stats['failed_writes'] += 1
-                                    error_msg = response.get('error', 'Unknown error')
-                                    self._log('warning', f"Failed to write {full_key}: {error_msg}")
-                                    
-                            except Exception as e:
-                                error_count += 1
-                                self.stats['failed_writes'] += 1
-                                error_msg = f"Error writing {tag_name}: {str(e)}"
-                                self._log('error', error_msg)
-                                if len(self.stats['errors']) < 100:  # Limit error list size
-                                    self.stats['errors'].append({
-                                        'time': time.time(),
-                                        'message': error_msg
-                                    })
-                
+                        value = get('value')
+                        if value is None or get('status') not in _OK_STATUSES:
+                            continue
+
+                        # Use tag_name as the key for Data-Service
+                        # Format: device_name.tag_name for uniqueness
+                        tag_name = get('tag_name') or get('name') or tag_id
+                        full_key = f"{device_name}:{tag_name}"
+                        if force_resend or last_get(full_key, _MISSING) != value:
+                            batch[full_key] = value
+
+                write_count, error_count = self._write_batch(batch) if batch else (0, 0)
+
                 # Update statistics
                 self.stats['total_syncs'] += 1
                 self.stats['last_sync_time'] = time.time()
                 
-                sync_duration = time.time() - sync_start
+                sync_duration = time.monotonic() - sync_start
                 
                 # Log periodic summary
                 if write_count > 0 or error_count > 0:
-                    self._log('debug', f"Sync cycle: {write_count} writes, {error_count} errors ({sync_duration:.2f}s)")
+                    logger.debug("Sync cycle: %d writes, %d errors (%.2fs)", write_count, error_count, sync_duration)
                 
                 if self.stats['total_syncs'] % 60 == 0:  # Every 60 syncs
-                    self._log('info', 
-                        f"Sync stats - Total: {self.stats['total_syncs']}, "
-                        f"Success: {self.stats['successful_writes']}, "
-                        f"Failed: {self.stats['failed_writes']}"
+                    logger.info(
+                        "Sync stats - Total: %d, Success: %d, Failed: %d",
+                        self.stats['total_syncs'],
+                        self.stats['successful_writes'],
+                        self.stats['failed_writes']
                     )
-                
-                # Sleep for remaining interval time
-                sleep_time = max(0, self.sync_interval - sync_duration)
-                if sleep_time > 0:
-                    self._stop_event.wait(sleep_time)
-                
+
             except Exception as e:
-                self._log('error', f"Error in Data-Service sync loop: {e}")
+                logger.error("Error in Data-Service sync loop: %s", e)
                 self._stop_event.wait(5)  # Wait longer on error
         
-        self._log('info', "🛑 Data-Service sync service stopped")
+        logger.info("🛑 Data-Service sync service stopped")
     
     def start(self):
         """Start the Data-Service sync thread"""
         if self._sync_thread and self._sync_thread.is_alive():
-            self._log('warning', "Data-Service sync already running")
+            logger.warning("Data-Service sync already running")
             return False
         
         self._stop_event.clear()
+        self._fetch_thread = threading.Thread(
+            target=self._fetch_loop,
+            daemon=True,
+            name="DataServiceFetch"
+        )
         self._sync_thread = threading.Thread(
             target=self._sync_to_dataservice, 
             daemon=True,
             name="DataServiceSync"
         )
+        self._fetch_thread.start()
         self._sync_thread.start()
-        self._log('info', "✓ Data-Service sync thread started")
+        logger.info("✓ Data-Service sync thread started")
         return True
     
     def stop(self):
         """Stop the Data-Service sync thread"""
         self._stop_event.set()
+        if self._fetch_thread:
+            self._fetch_thread.join(timeout=5)
         if self._sync_thread:
             self._sync_thread.join(timeout=5)
-        self._log('info', "✓ Data-Service sync thread stopped")
+        logger.info("✓ Data-Service sync thread stopped")
     
     def is_running(self) -> bool:
         """Check if sync service is running"""
@@ -186,20 +365,15 @@ class DataServiceSyncService:
         """Get sync service statistics"""
         return {
             **self.stats,
+            'errors': list(self.stats['errors']),
             'running': self.is_running()
         }
 
 
-# Singleton instance for easy import
-_sync_service: Optional[DataServiceSyncService] = None
-
-
+@cache
 def get_dataservice_sync() -> DataServiceSyncService:
-    """Get or create the singleton sync service instance"""
-    global _sync_service
-    if _sync_service is None:
-        _sync_service = DataServiceSyncService()
-    return _sync_service
+    """Get or create the singleton sync service instance (thread-safe)"""
+    return DataServiceSyncService()
 
 
 def start_dataservice_sync():
@@ -2,12 +2,93 @@ import threading
 import uuid
 import time
 from typing import Any, Dict, Optional, Tuple, Union, Callable, List
-from collections import defaultdict
+from collections import Counter, defaultdict, deque
+from itertools import islice
+from contextlib import contextmanager
+
+
+class _ReadWriteLock:
+    """
+    Small reader-writer lock: any number of concurrent readers, writers
+    exclusive. Waiting writers block new readers so a steady stream of
+    snapshot polls cannot starve register/write.
+    """
+
+    def __init__(self) -> None:
+        self._cond = threading.Condition()
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+
+    @contextmanager
+    def read_locked(self):
+        with self._cond:
+            while self._writer or self._waiting_writers:
+                self._cond.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._readers -= 1
+                if self._readers == 0:
+                    self._cond.notify_all()
+
+    @contextmanager
+    def write_locked(self):
+        with self._cond:
+            self._waiting_writers += 1
+            try:
+                while self._writer or self._readers > 0:
+                    self._cond.wait()
+            finally:
+                self._waiting_writers -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writer = False
+                self._cond.notify_all()
+
+
+def _coerce_int(value: Any) -> int:
+    return int(float(value))
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+# Quality kept as a small int internally (cheap compares on every write);
+# translated back to the wire strings in to_dict
+QUALITY_GOOD = 0
+QUALITY_BAD = 1
+QUALITY_UNCERTAIN = 2
+_QUALITY_NAMES = ('GOOD', 'BAD', 'UNCERTAIN')
+
+# Dense address table bounds: one slot per address in the 40001-45000
+# protocol range, so address lookups are a list index instead of dict probes
+_ADDR_BASE = 40001
+_ADDR_SIZE = 5000
+
+# Converter per data type, bound onto each DataPoint at registration so
+# writes call it directly instead of re-branching on the type string
+_COERCERS: Dict[str, Callable[[Any], Any]] = {
+    'int': _coerce_int,
+    'float': float,
+    'bool': bool,
+    'string': str,
+}
 
 
 class DataPoint:
     """Simplified data point for IoT gateway data service"""
-    def __init__(self, key: str, value: Any = 0, default: Any = 0, address: Optional[int] = None, 
+
+    __slots__ = ('key', 'value', 'default', 'address', 'data_type',
+                 'units', 'timestamp', 'quality', 'last_change', '_coerce')
+
+    def __init__(self, key: str, value: Any = 0, default: Any = 0, address: Optional[int] = None,
                  data_type: str = "float", units: str = ""):
         self.key = key
         self.value = value
@@ -15,17 +96,21 @@ class DataPoint:
         self.address = address
         self.data_type = data_type
         self.units = units
-        self.timestamp = time.time()
-        self.quality = "GOOD"  # GOOD, BAD, UNCERTAIN
-        self.last_change = time.time()
+        self._coerce = _COERCERS.get(data_type, _identity)
+        now = time.time()
+        self.timestamp = now
+        self.quality = QUALITY_GOOD
+        self.last_change = now
 
-    def set_value(self, new_value: Any):
+    def set_value(self, new_value: Any, now: Optional[float] = None):
         """Set value with timestamp and change detection"""
+        if now is None:
+            now = time.time()
         if self.value != new_value:
-            self.last_change = time.time()
+            self.last_change = now
         self.value = new_value
-        self.timestamp = time.time()
-        self.quality = "GOOD"
+        self.timestamp = now
+        self.quality = QUALITY_GOOD
 
     def to_dict(self):
         return {
@@ -36,7 +121,7 @@ class DataPoint:
             'data_type': self.data_type,
             'units': self.units,
             'timestamp': self.timestamp,
-            'quality': self.quality,
+            'quality': _QUALITY_NAMES[self.quality],
             'last_change': self.last_change
         }
 
@@ -52,19 +137,31 @@ class DataStore:
     """
 
     def __init__(self) -> None:
-        self._lock = threading.RLock()
+        self._lock = _ReadWriteLock()
+        # Monotonic version counter, bumped on every mutation so callers
+        # can cheaply detect whether a cached snapshot is still current
+        self._version = 0
         self._data_points: Dict[str, DataPoint] = {}
         self._key_to_address: Dict[str, int] = {}
         self._address_to_key: Dict[int, str] = {}
         self._key_to_id: Dict[str, str] = {}
         self._id_to_key: Dict[str, str] = {}
+        # Dense address -> DataPoint table for the standard protocol range;
+        # addresses registered outside it fall back to the dicts above
+        self._addr_table: List[Optional[DataPoint]] = [None] * _ADDR_SIZE
+        # Occupancy bitmap over the same range; bytearray.index scans it
+        # at C speed when allocating
+        self._addr_used = bytearray(_ADDR_SIZE)
         
-        # Event system for real-time updates
-        self._change_listeners: List[Callable] = []
+        # Event system for real-time updates. Copy-on-write tuple: add
+        # replaces the whole tuple atomically, so notification can iterate
+        # a plain snapshot without holding the lock
+        self._change_listeners: Tuple[Callable, ...] = ()
         
-        # Simple historical data (ring buffer)
-        self._history: Dict[str, List] = defaultdict(list)
+        # Simple historical data (bounded ring buffer per key)
         self._max_history_size = 1000
+        self._history: Dict[str, deque] = defaultdict(
+            lambda: deque(maxlen=self._max_history_size))
 
         # Address space allocation strategy
         self._address_ranges = {
@@ -84,41 +181,60 @@ class DataStore:
         # Auto-seeding disabled - no default points created
         pass
 
+    def __len__(self) -> int:
+        """Number of registered data points"""
+        with self._lock.read_locked():
+            return len(self._data_points)
+
+    @property
+    def version(self) -> int:
+        """Current mutation counter (changes whenever stored data changes)"""
+        return self._version
+
     # ---------------------- Event System ----------------------
     def add_change_listener(self, callback: Callable):
         """Add listener for data changes"""
-        with self._lock:
-            self._change_listeners.append(callback)
+        with self._lock.write_locked():
+            self._change_listeners = self._change_listeners + (callback,)
 
-    def _notify_change(self, key: str, old_value: Any, new_value: Any):
+    def _notify_change(self, key: str, old_value: Any, new_value: Any,
+                       now: Optional[float] = None):
         """Notify listeners of data changes"""
-        for callback in self._change_listeners:
-            try:
-                callback(key, old_value, new_value, time.time())
-            except Exception as e:
-                print(f"Error in change listener: {e}")
+        listeners = self._change_listeners
+        if not listeners:
+            return
+        if now is None:
+            now = time.time()
+        try:
+            for callback in listeners:
+                callback(key, old_value, new_value, now)
+        except Exception as e:
+            # Name the offender: one raising listener also skips every
+            # listener registered after it for this change
+            print(f"Error in change listener {callback!r} "
+                  f"(remaining listeners skipped): {e}")
 
     # ---------------------- Registration & Metadata ----------------------
     def _allocate_address(self, data_type: str) -> int:
-        """Allocate next available address for data type"""
-        with self._lock:
-            if data_type not in self._next_addresses:
-                data_type = 'float'  # Default fallback
-            
-            start, end = self._address_ranges[data_type]
-            next_addr = self._next_addresses[data_type]
-            
-            # Find next available address in range
-            while next_addr <= end:
-                if next_addr not in self._address_to_key:
-                    self._next_addresses[data_type] = next_addr + 1
-                    return next_addr
-                next_addr += 1
-            
+        """Allocate next available address for data type (caller holds the write lock)"""
+        if data_type not in self._next_addresses:
+            data_type = 'float'  # Default fallback
+
+        start, end = self._address_ranges[data_type]
+        next_addr = self._next_addresses[data_type]
+
+        # Find next free slot in the occupancy bitmap
+        try:
+            idx = self._addr_used.index(0, next_addr - _ADDR_BASE, end - _ADDR_BASE + 1)
+        except ValueError:
             # Range exhausted, wrap to start of range
             self._next_addresses[data_type] = start
             raise ValueError(f"Address range exhausted for data_type '{data_type}' (range: {start}-{end})")
 
+        address = idx + _ADDR_BASE
+        self._next_addresses[data_type] = address + 1
+        return address
+
     def register(
         self,
         key: str,
@@ -145,7 +261,7 @@ class DataStore:
         Returns:
             Allocated address
         """
-        with self._lock:
+        with self._lock.write_locked():
             # Auto-allocate address if not provided
             if address is None and auto_allocate:
                 address = self._allocate_address(data_type)
@@ -157,139 +273,216 @@ class DataStore:
                         raise ValueError(f"Address {address} already used by key '{existing_key}'")
                 self._key_to_address[key] = address
                 self._address_to_key[address] = key
+                idx = address - _ADDR_BASE
+                if 0 <= idx < _ADDR_SIZE:
+                    self._addr_used[idx] = 1
 
             # Create or update data point
             if key in self._data_points:
                 dp = self._data_points[key]
                 dp.default = default
                 dp.data_type = data_type
+                dp._coerce = _COERCERS.get(data_type, _identity)
                 dp.units = units
                 if address is not None:
                     dp.address = address
             else:
                 dp = DataPoint(key, default, default, address, data_type, units)
                 self._data_points[key] = dp
-            
+
+            if address is not None:
+                idx = address - _ADDR_BASE
+                if 0 <= idx < _ADDR_SIZE:
+                    self._addr_table[idx] = dp
+
+            self._version += 1
             return address or 0
 
     def ensure_id(self, key: str) -> str:
         """Ensure a unique ID exists for this key"""
-        with self._lock:
+        with self._lock.write_locked():
             if key not in self._key_to_id:
                 data_id = str(uuid.uuid4()).replace('-', '')
                 self._key_to_id[key] = data_id
                 self._id_to_key[data_id] = key
+                self._version += 1
             return self._key_to_id[key]
 
     # ---------------------- Data Access ----------------------
+    def _dp_by_address(self, address: int) -> Optional[DataPoint]:
+        """Resolve an address to its DataPoint (caller holds a lock)"""
+        idx = address - _ADDR_BASE
+        if 0 <= idx < _ADDR_SIZE:
+            return self._addr_table[idx]
+        key = self._address_to_key.get(address)
+        return self._data_points.get(key) if key else None
+
     def read(self, key_or_address: Union[str, int]) -> Any:
-        with self._lock:
+        with self._lock.read_locked():
             if isinstance(key_or_address, str):
-                key = key_or_address
+                dp = self._data_points.get(key_or_address)
             else:
-                key = self._address_to_key.get(key_or_address)
-                if not key:
-                    return 0
+                dp = self._dp_by_address(key_or_address)
+            return dp.value if dp else 0
 
-            dp = self._data_points.get(key)
-            if dp:
-                return dp.value
-            return 0
+    def read_many(self, keys) -> Dict[str, Any]:
+        """Read several keys under a single lock acquisition
+
+        Args:
+            keys: Iterable of data point keys
+
+        Returns:
+            Dict mapping each key to its value (0 for unknown keys,
+            matching read())
+        """
+        with self._lock.read_locked():
+            data_points_get = self._data_points.get
+            result = {}
+            for key in keys:
+                dp = data_points_get(key)
+                result[key] = dp.value if dp else 0
+            return result
 
     def write(self, key_or_address: Union[str, int], value: Any) -> None:
-        with self._lock:
+        with self._lock.write_locked():
+            # Only update existing data points - do not create new ones
             if isinstance(key_or_address, str):
-                key = key_or_address
+                dp = self._data_points.get(key_or_address)
             else:
-                key = self._address_to_key.get(key_or_address)
-                if not key:
-                    return
-
-            # Only update existing data points - do not create new ones
-            if key not in self._data_points:
+                dp = self._dp_by_address(key_or_address)
+            if dp is None:
                 return
-            
-            dp = self._data_points[key]
+
+            key = dp.key
             old_value = dp.value
-            
+
             # Validate and coerce value based on data type
             validated_value = self._coerce_value(dp, value)
-            
-            # Update value
-            dp.set_value(validated_value)
-            
+
+            # One timestamp per write, shared by value, history and listeners
+            now = time.time()
+            dp.set_value(validated_value, now)
+            self._version += 1
+
             # Add to history
-            self._add_to_history(key, validated_value)
-            
-            # Notify listeners
-            if old_value != validated_value:
-                self._notify_change(key, old_value, validated_value)
+            self._add_to_history(key, validated_value, now)
+
+        # Notify listeners outside the lock so callbacks may read the store
+        if old_value != validated_value:
+            self._notify_change(key, old_value, validated_value, now)
+
+    def bulk_write(self, pairs: List[Tuple[str, Any]]) -> List[bool]:
+        """
+        Write many key/value pairs under a single lock acquisition
+
+        Args:
+            pairs: Iterable of (key, value) tuples; unknown keys are
+                skipped, matching write()
+
+        Returns:
+            One boolean per pair, True where the write was applied
+        """
+        applied = []
+        notifications = []
+        with self._lock.write_locked():
+            # Hoist per-iteration attribute lookups out of the loop
+            data_points_get = self._data_points.get
+            coerce = self._coerce_value
+            add_to_history = self._add_to_history
+            add_applied = applied.append
+            add_notification = notifications.append
+            written = 0
+            now = time.time()
+            for key, value in pairs:
+                dp = data_points_get(key)
+                if dp is None:
+                    add_applied(False)
+                    continue
+
+                old_value = dp.value
+                validated_value = coerce(dp, value)
+                dp.set_value(validated_value, now)
+                written += 1
+                add_to_history(key, validated_value, now)
+                if old_value != validated_value:
+                    add_notification((key, old_value, validated_value))
+                add_applied(True)
+            self._version += written
+
+        # Notify listeners outside the lock so callbacks may read the store
+        for key, old_value, new_value in notifications:
+            self._notify_change(key, old_value, new_value, now)
+        return applied
 
     def _coerce_value(self, dp: DataPoint, value: Any) -> Any:
-        """Coerce value based on data type"""
+        """Coerce value using the converter bound at registration"""
         try:
-            if dp.data_type == "int":
-                return int(float(value))
-            elif dp.data_type == "float":
-                return float(value)
-            elif dp.data_type == "bool":
-                return bool(value)
-            elif dp.data_type == "string":
-                return str(value)
-            else:
-                return value
+            return dp._coerce(value)
         except (ValueError, TypeError):
-            dp.quality = "BAD"
+            dp.quality = QUALITY_BAD
             return dp.default
 
-    def _add_to_history(self, key: str, value: Any):
-        """Add value to historical data"""
-        history = self._history[key]
-        history.append({
-            'timestamp': time.time(),
-            'value': value
-        })
-        
-        # Trim history if too large
-        if len(history) > self._max_history_size:
-            history.pop(0)
+    def _add_to_history(self, key: str, value: Any, now: Optional[float] = None):
+        """Add value to historical data (the deque's maxlen handles trimming).
+
+        Entries are stored as (timestamp, value) tuples; get_history
+        materializes the dict form expected by callers."""
+        self._history[key].append((time.time() if now is None else now, value))
 
     # ---------------------- Data Retrieval ----------------------
     def snapshot(self) -> Dict[str, Any]:
         """Get current snapshot of all data"""
-        with self._lock:
+        with self._lock.read_locked():
             return {key: dp.value for key, dp in self._data_points.items()}
 
     def detailed_snapshot(self) -> Dict[str, Dict]:
         """Get detailed snapshot with metadata"""
-        with self._lock:
+        with self._lock.read_locked():
             return {key: dp.to_dict() for key, dp in self._data_points.items()}
 
+    def get_details_by_ids(self, data_ids: List[str]) -> Dict[str, Dict]:
+        """Get detailed metadata for just the given data IDs (keyed by key);
+        unknown IDs are skipped"""
+        with self._lock.read_locked():
+            details = {}
+            id_to_key_get = self._id_to_key.get
+            data_points_get = self._data_points.get
+            for data_id in data_ids:
+                key = id_to_key_get(data_id)
+                if key:
+                    dp = data_points_get(key)
+                    if dp:
+                        details[key] = dp.to_dict()
+            return details
+
     def get_history(self, key: str, limit: int = 100) -> List[Dict]:
         """Get historical data for a key"""
-        with self._lock:
-            history = self._history.get(key, [])
-            return history[-limit:] if limit > 0 else history
+        with self._lock.read_locked():
+            history = self._history.get(key)
+            if history is None:
+                return []
+            if limit > 0:
+                entries = islice(history, max(len(history) - limit, 0), None)
+            else:
+                entries = history
+            return [{'timestamp': ts, 'value': value} for ts, value in entries]
 
     def address_space(self) -> Dict[int, Any]:
         """Get current address space mapping"""
-        with self._lock:
+        with self._lock.read_locked():
+            data_points_get = self._data_points.get
             space = {}
             for addr, key in self._address_to_key.items():
-                dp = self._data_points.get(key)
+                dp = data_points_get(key)
                 space[addr] = dp.value if dp else 0
             return space
 
     def to_modbus_register(self, address: int) -> int:
         """Convert value at address to Modbus register format"""
-        key = self._address_to_key.get(address)
-        if not key:
-            return 0
-        
-        dp = self._data_points.get(key)
+        dp = self._dp_by_address(address)
         if not dp:
             return 0
-            
+
         value = dp.value
         if isinstance(value, (int, float)):
             # Scale by 10 and convert to int for Modbus
@@ -301,24 +494,22 @@ class DataStore:
 
     def get_statistics(self) -> Dict:
         """Get datastore statistics"""
-        with self._lock:
+        with self._lock.read_locked():
             return {
                 'total_points': len(self._data_points),
                 'total_addresses': len(self._address_to_key),
                 'history_points': len(self._history),
-                'total_history_entries': sum(len(hist) for hist in self._history.values()),
-                'bad_quality_points': sum(1 for dp in self._data_points.values() if dp.quality != 'GOOD')
+                'total_history_entries': sum(map(len, self._history.values())),
+                'bad_quality_points': sum(dp.quality != QUALITY_GOOD for dp in self._data_points.values())
             }
 
     def get_address_space_info(self) -> Dict:
         """Get address space allocation information"""
-        with self._lock:
+        with self._lock.read_locked():
             # Count points by data type
-            type_counts = {}
-            for dp in self._data_points.values():
-                data_type = dp.data_type
-                type_counts[data_type] = type_counts.get(data_type, 0) + 1
-            
+            type_counts = Counter(dp.data_type for dp in self._data_points.values())
+
+
             # Get next available addresses
             next_addresses = {}
             for data_type, (start, end) in self._address_ranges.items():
@@ -335,7 +526,7 @@ class DataStore:
                 'address_ranges': self._address_ranges,
                 'next_addresses': next_addresses,
                 'total_allocated': len(self._address_to_key),
-                'type_distribution': type_counts
+                'type_distribution': dict(type_counts)
             }
 
 # Global instance
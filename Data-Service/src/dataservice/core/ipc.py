@@ -1,10 +1,51 @@
 import os
 import json
+import select
 import socket
 import threading
 from typing import Optional
 from .datastore import DATA_STORE
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _loads(data: bytes) -> dict:
+    """Parse one NDJSON frame (orjson when available)"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _dumps_line(payload: dict) -> bytes:
+    """Serialize one NDJSON frame, newline included"""
+    if orjson is not None:
+        return orjson.dumps(payload) + b"\n"
+    return (json.dumps(payload) + "\n").encode()
+
+
+# The plain success response is by far the most common frame; serialize
+# it once instead of on every write acknowledgement
+_OK_PAYLOAD = {"ok": True}
+_OK_RESPONSE = b'{"ok":true}\n'
+
+
+def _read_line(sock: socket.socket, buf: bytearray) -> bytes:
+    """Pop one newline-delimited frame from buf, receiving more as needed.
+    Returns b"" on EOF; bytes past the newline stay in buf for the next frame."""
+    nl = buf.find(b"\n")
+    while nl == -1:
+        chunk = sock.recv(4096)
+        if not chunk:
+            return b""
+        buf += chunk
+        nl = buf.find(b"\n")
+    line = bytes(buf[:nl])
+    del buf[:nl + 1]
+    return line
+
 
 class IpcServer:
     """
@@ -13,6 +54,7 @@ class IpcServer:
     Requests:
       {"action":"write","key":"temperature","value":28.7}
       {"action":"write_by_id","id":"<uuid_no_dashes>","value":28.7}
+      {"action":"write_many","data":{"temperature":28.7,"humidity":41.0}}
 
     Responses:
       {"ok":true}
@@ -24,6 +66,12 @@ class IpcServer:
         self._server: Optional[socket.socket] = None
         self._thread: Optional[threading.Thread] = None
         self._stop = threading.Event()
+        # The id -> key dict only ever grows and is never reassigned, so
+        # its bound .get can be cached once for the per-request lookups
+        self._id_to_key_get = DATA_STORE._id_to_key.get
+        # Self-pipe used to wake the accept loop out of select() on stop()
+        self._wake_r: Optional[int] = None
+        self._wake_w: Optional[int] = None
 
     def start(self) -> None:
         if self._thread and self._thread.is_alive():
@@ -46,17 +94,27 @@ class IpcServer:
         srv.listen(5)
         self._server = srv
         self._stop.clear()
+        wake_r, wake_w = os.pipe()
+        self._wake_r, self._wake_w = wake_r, wake_w
 
         def run():
+            # Block in select() on the listener plus the wake pipe, so
+            # stop() interrupts immediately instead of waiting out an
+            # accept timeout
             while not self._stop.is_set():
                 try:
-                    srv.settimeout(1.0)
-                    try:
-                        conn, _ = srv.accept()
-                    except socket.timeout:
-                        continue
-                    threading.Thread(target=self._handle_client, args=(conn,), daemon=True).start()
+                    readable, _, _ = select.select([srv, wake_r], [], [])
+                    if wake_r in readable:
+                        break
+                    if srv in readable:
+                        try:
+                            conn, _ = srv.accept()
+                        except OSError:
+                            continue
+                        threading.Thread(target=self._handle_client, args=(conn,), daemon=True).start()
                 except Exception as e:
+                    if self._stop.is_set():
+                        break
                     # Keep server alive; print error for visibility
                     print(f"IPC accept error: {e}")
 
@@ -65,6 +123,14 @@ class IpcServer:
 
     def stop(self) -> None:
         self._stop.set()
+        try:
+            if self._wake_w is not None:
+                os.write(self._wake_w, b"\0")
+        except OSError:
+            pass
+        if self._thread:
+            self._thread.join(timeout=2)
+            self._thread = None
         try:
             if self._server:
                 self._server.close()
@@ -72,6 +138,13 @@ class IpcServer:
             pass
         finally:
             self._server = None
+        for fd in (self._wake_r, self._wake_w):
+            if fd is not None:
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+        self._wake_r = self._wake_w = None
         try:
             if os.path.exists(self.socket_path):
                 os.unlink(self.socket_path)
@@ -79,108 +152,171 @@ class IpcServer:
             pass
 
     def _handle_client(self, conn: socket.socket) -> None:
+        # Serve any number of requests on this connection so clients can
+        # keep one socket open instead of reconnecting per call
+        buf = bytearray()
         try:
-            f = conn.makefile(mode="rwb")
-            line = f.readline()
-            if not line:
-                return
+            while True:
+                line = _read_line(conn, buf)
+                if not line:
+                    return
+                try:
+                    req = _loads(line)
+                except Exception as e:
+                    self._send(conn, ok=False, error=f"invalid json: {e}")
+                    continue
+                self._handle_request(conn, req)
+        except Exception as e:
             try:
-                req = json.loads(line.decode().strip())
-            except Exception as e:
-                self._send(f, ok=False, error=f"invalid json: {e}")
-                return
+                self._send(conn, ok=False, error=str(e))
+            except Exception:
+                pass
+        finally:
+            try:
+                conn.close()
+            except Exception:
+                pass
 
+    def _handle_request(self, conn: socket.socket, req: dict) -> None:
+        try:
             action = req.get("action")
             if action == "write":
                 key = req.get("key")
                 if not isinstance(key, str) or key == "":
-                    self._send(f, ok=False, error="key required")
+                    self._send(conn, ok=False, error="key required")
                     return
                 DATA_STORE.write(key, req.get("value"))
-                self._send(f, ok=True)
+                self._send(conn, ok=True)
                 return
 
             if action == "write_by_id":
                 data_id = req.get("id")
                 if not isinstance(data_id, str) or data_id == "":
-                    self._send(f, ok=False, error="id required")
+                    self._send(conn, ok=False, error="id required")
                     return
-                key = DATA_STORE._id_to_key.get(data_id)  # Internal map already present
+                key = self._id_to_key_get(data_id)  # Internal map already present
                 if not key:
-                    self._send(f, ok=False, error="id not found")
+                    self._send(conn, ok=False, error="id not found")
                     return
                 DATA_STORE.write(key, req.get("value"))
-                self._send(f, ok=True, key=key)
+                self._send(conn, ok=True, key=key)
+                return
+
+            if action == "write_many":
+                data = req.get("data")
+                if not isinstance(data, dict):
+                    self._send(conn, ok=False, error="data must be an object")
+                    return
+
+                results = {}
+                pairs = []
+                for key, value in data.items():
+                    if not isinstance(key, str) or key == "":
+                        results[key] = {"ok": False, "error": "key required"}
+                        continue
+                    pairs.append((key, value))
+                    results[key] = {"ok": True}
+
+                try:
+                    DATA_STORE.bulk_write(pairs)
+                except Exception as e:
+                    self._send(conn, ok=False, error=str(e))
+                    return
+
+                self._send(conn, ok=True, results=results)
                 return
 
             if action == "bulk_write_by_id":
                 updates = req.get("updates")
                 if not isinstance(updates, list):
-                    self._send(f, ok=False, error="updates must be a list")
+                    self._send(conn, ok=False, error="updates must be a list")
                     return
                 
                 results = []
+                pairs = []
+                id_to_key_get = self._id_to_key_get
                 for update in updates:
                     data_id = update.get("id")
-                    value = update.get("value")
                     if not isinstance(data_id, str) or data_id == "":
                         results.append({"id": data_id, "ok": False, "error": "id required"})
                         continue
-                    
-                    key = DATA_STORE._id_to_key.get(data_id)
+
+                    key = id_to_key_get(data_id)
                     if not key:
                         results.append({"id": data_id, "ok": False, "error": "id not found"})
                         continue
-                    
-                    try:
-                        DATA_STORE.write(key, value)
-                        results.append({"id": data_id, "ok": True, "key": key})
-                    except Exception as e:
-                        results.append({"id": data_id, "ok": False, "error": str(e)})
-                
-                self._send(f, ok=True, results=results)
+
+                    pairs.append((key, update.get("value")))
+                    results.append({"id": data_id, "ok": True, "key": key})
+
+                try:
+                    DATA_STORE.bulk_write(pairs)
+                except Exception as e:
+                    self._send(conn, ok=False, error=str(e))
+                    return
+
+                self._send(conn, ok=True, results=results)
                 return
 
-            self._send(f, ok=False, error="unknown action")
+            self._send(conn, ok=False, error="unknown action")
         except Exception as e:
-            try:
-                self._send(conn, ok=False, error=str(e))
-            except Exception:
-                pass
-        finally:
-            try:
-                conn.close()
-            except Exception:
-                pass
+            self._send(conn, ok=False, error=str(e))
 
-    def _send(self, f, **payload) -> None:
+    def _send(self, conn: socket.socket, **payload) -> None:
         try:
-            data = (json.dumps(payload) + "\n").encode()
-            if hasattr(f, "write"):
-                f.write(data)
-                f.flush()
+            if payload == _OK_PAYLOAD:
+                conn.sendall(_OK_RESPONSE)
             else:
-                f.sendall(data)
+                conn.sendall(_dumps_line(payload))
         except Exception as e:
             print(f"IPC send error: {e}")
 
 
 class IpcClient:
+    """Client keeping one persistent connection to the IPC server;
+    reconnects transparently if the server restarts"""
+
     def __init__(self, socket_path: Optional[str] = None) -> None:
         self.socket_path = socket_path or os.getenv("IPC_SOCKET_PATH", "/tmp/dataservice.sock")
+        self._sock: Optional[socket.socket] = None
+        self._buf = bytearray()
+        self._sock_lock = threading.Lock()
+
+    def close(self) -> None:
+        """Close the persistent connection (reopened lazily on next call)"""
+        with self._sock_lock:
+            self._close_locked()
+
+    def _close_locked(self) -> None:
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+            self._sock = None
+        self._buf.clear()
+
+    def _send_recv(self, data: bytes) -> dict:
+        if self._sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.connect(self.socket_path)
+            self._sock = sock
+            self._buf.clear()
+        self._sock.sendall(data)
+        line = _read_line(self._sock, self._buf)
+        if not line:
+            raise ConnectionResetError("empty response")
+        return _loads(line)
 
     def _rpc(self, request: dict) -> dict:
-        s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
-        s.connect(self.socket_path)
-        try:
-            s.sendall((json.dumps(request) + "\n").encode())
-            f = s.makefile("rb")
-            line = f.readline()
-            if not line:
-                raise RuntimeError("empty response")
-            return json.loads(line.decode())
-        finally:
-            s.close()
+        data = _dumps_line(request)
+        with self._sock_lock:
+            try:
+                return self._send_recv(data)
+            except (ConnectionError, BrokenPipeError, OSError):
+                # Stale socket (server restarted); reconnect once and retry
+                self._close_locked()
+                return self._send_recv(data)
 
     def write(self, key: str, value) -> dict:
         return self._rpc({"action": "write", "key": key, "value": value})
@@ -188,6 +324,19 @@ class IpcClient:
     def write_by_id(self, data_id: str, value) -> dict:
         return self._rpc({"action": "write_by_id", "id": data_id, "value": value})
 
+    def write_many(self, pairs: dict) -> dict:
+        """
+        Write multiple key/value pairs in a single request frame
+
+        Args:
+            pairs: Dict mapping data point keys to new values
+            Example: {"temperature": 28.7, "motor_status": True}
+
+        Returns:
+            dict with 'ok' and per-key 'results'
+        """
+        return self._rpc({"action": "write_many", "data": pairs})
+
     def bulk_write_by_id(self, updates: list) -> dict:
         """
         Bulk update multiple data points by their UIDs
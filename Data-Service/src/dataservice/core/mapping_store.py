@@ -6,15 +6,53 @@ class ProtocolMapping:
     """Base class for protocol-specific mappings"""
     
     def __init__(self):
-        self._lock = threading.RLock()
+        # Plain Lock: no method re-enters another locked method, and a
+        # non-reentrant lock is cheaper to acquire than RLock
+        self._lock = threading.Lock()
         self._mappings: Dict[str, Dict[str, Any]] = {}
+        # Reverse index key -> data_id, maintained alongside _mappings so
+        # find_by_key is a dict probe instead of a scan over all mappings
+        self._key_to_id: Dict[str, str] = {}
+        # Bumped on every mutation; server loops compare it to decide
+        # whether their cached copy of the mappings is still current
+        self._version = 0
+
+    @property
+    def version(self) -> int:
+        """Monotonic counter incremented whenever the mappings change"""
+        return self._version
 
     def set_mapping(self, data_id: str, key: str, **protocol_attrs):
         """Set mapping with protocol-specific attributes"""
         with self._lock:
             mapping = {"key": key}
             mapping.update(protocol_attrs)
+            old = self._mappings.get(data_id)
+            if old is not None and old["key"] != key:
+                self._key_to_id.pop(old["key"], None)
             self._mappings[data_id] = mapping
+            self._key_to_id[key] = data_id
+            self._version += 1
+
+    def set_mappings_bulk(self, mappings):
+        """Set many mappings with a single lock acquisition
+
+        Args:
+            mappings: Iterable of (data_id, key, protocol_attrs) tuples where
+                protocol_attrs holds the same attributes set_mapping would store
+        """
+        with self._lock:
+            store = self._mappings
+            key_index = self._key_to_id
+            for data_id, key, protocol_attrs in mappings:
+                mapping = {"key": key}
+                mapping.update(protocol_attrs)
+                old = store.get(data_id)
+                if old is not None and old["key"] != key:
+                    key_index.pop(old["key"], None)
+                store[data_id] = mapping
+                key_index[key] = data_id
+            self._version += 1
 
     def get_mapping(self, data_id: str) -> Optional[Dict[str, Any]]:
         """Get mapping for a data ID"""
@@ -24,7 +62,11 @@ class ProtocolMapping:
     def remove_mapping(self, data_id: str):
         """Remove mapping"""
         with self._lock:
-            self._mappings.pop(data_id, None)
+            mapping = self._mappings.pop(data_id, None)
+            if mapping is not None:
+                if self._key_to_id.get(mapping["key"]) == data_id:
+                    self._key_to_id.pop(mapping["key"], None)
+                self._version += 1
 
     def all(self) -> Dict[str, Dict[str, Any]]:
         """Get all mappings"""
@@ -34,10 +76,10 @@ class ProtocolMapping:
     def find_by_key(self, key: str) -> Optional[Dict[str, Any]]:
         """Find mapping by key"""
         with self._lock:
-            for data_id, mapping in self._mappings.items():
-                if mapping.get("key") == key:
-                    return {"id": data_id, **mapping}
-            return None
+            data_id = self._key_to_id.get(key)
+            if data_id is None:
+                return None
+            return {"id": data_id, **self._mappings[data_id]}
 
 
 class ModbusMapping(ProtocolMapping):
@@ -150,7 +192,12 @@ class OPCUAMapping(ProtocolMapping):
 
 class SNMPMapping(ProtocolMapping):
     """SNMP specific mapping"""
-    
+
+    # Shared OID prefix for scalars exposed by the agent; full OIDs are
+    # enterprise_oid + (oid_suffix,). One interned tuple, never rebuilt
+    # per varbind (1.3.6.1.4.1.9999.1 — demo private-enterprise arc)
+    enterprise_oid = (1, 3, 6, 1, 4, 1, 9999, 1)
+
     def set_mapping(self, data_id: str, key: str,
                    oid: str,  # e.g., "1.3.6.1.4.1.9999.1.1.1"
                    syntax: str = "Gauge32",  # SNMP syntax
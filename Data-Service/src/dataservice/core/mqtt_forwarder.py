@@ -1,11 +1,26 @@
 import os
 import json
-import time
 import threading
-from queue import Queue, Full, Empty
+from concurrent.futures import ThreadPoolExecutor
 import paho.mqtt.client as mqtt
 from .datastore import DATA_STORE
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# Sentinel distinguishing "never published" from a stored falsy value
+_MISSING = object()
+
+
+def _dumps(payload) -> bytes:
+    """Serialize a snapshot to bytes (orjson when available; paho accepts bytes)"""
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload).encode()
+
 
 class MqttForwarder:
     def __init__(self) -> None:
@@ -19,13 +34,29 @@ class MqttForwarder:
         self._retain = os.getenv('MQTT_RETAIN', 'false').lower() == 'true'
         self._publish_interval = float(os.getenv('MQTT_PUBLISH_INTERVAL_SEC', '1.0'))
         self._max_queue = int(os.getenv('MQTT_MAX_QUEUE', '1000'))
-
+        # Delta mode publishes only changed keys to per-tag topics instead
+        # of re-sending the full snapshot every interval
+        self._delta_mode = os.getenv('MQTT_DELTA_MODE', 'false').lower() in ('1', 'true')
         self._client = mqtt.Client(client_id=self._client_id, clean_session=True)
         if self._username:
             self._client.username_pw_set(self._username, self._password)
 
-        # Buffers outgoing payloads when disconnected
-        self._out_queue: Queue[str] = Queue(maxsize=self._max_queue)
+        # paho buffers outgoing messages internally while disconnected;
+        # bound that queue like the old hand-rolled one was
+        self._client.max_queued_messages_set(self._max_queue)
+        # Last published snapshot payload, for suppressing identical re-publishes
+        self._last_payload: bytes = b""
+        # Store version already serialized; skips snapshot + serialization
+        # on ticks where nothing was written at all
+        self._store_seen_version = -1
+        # Delta-mode state: last published value per key, plus a monotonic
+        # sequence number so subscribers can detect dropped deltas and
+        # refetch a full snapshot
+        self._last_values: dict = {}
+        self._seq = 0
+        # Snapshot serialization runs on this worker so it overlaps the
+        # publish interval instead of stalling the publisher thread
+        self._ser_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='mqtt-ser')
         self._connected = threading.Event()
         self._stop = threading.Event()
 
@@ -47,6 +78,7 @@ class MqttForwarder:
 
     def stop(self):
         self._stop.set()
+        self._ser_pool.shutdown(wait=False)
         try:
             self._client.disconnect()
         except Exception:
@@ -55,55 +87,61 @@ class MqttForwarder:
     def _run(self):
         # Connection loop
         self._client.loop_start()
+        # Snapshot payload still being serialized on the worker; published
+        # on the next tick so serialization overlaps the interval wait
+        pending = None
         while not self._stop.is_set():
             try:
                 if not self._connected.is_set():
                     try:
                         self._client.connect(self._host, self._port, keepalive=30)
                     except Exception:
-                        time.sleep(2)
+                        self._stop.wait(2)
                         continue
-                # Publish snapshot periodically
-                snapshot = DATA_STORE.snapshot()
-                payload = json.dumps(snapshot)
-                topic = f"{self._topic_prefix}/snapshot"
-                self._enqueue(payload, topic)
-
-                # Drain queue if connected
-                if self._connected.is_set():
-                    while True:
-                        try:
-                            topic, msg = self._out_queue.get_nowait()
-                        except Empty:
-                            break
-                        try:
-                            self._client.publish(topic, msg, qos=self._qos, retain=self._retain)
-                        except Exception:
-                            # Put back and break to reconnect later
-                            try:
-                                self._out_queue.put_nowait((topic, msg))
-                            except Full:
-                                pass
-                            break
-
-                time.sleep(self._publish_interval)
+                # Publish snapshot periodically; skip when nothing changed
+                if self._delta_mode:
+                    self._publish_deltas(DATA_STORE.snapshot())
+                else:
+                    # Re-serialize only if the store moved since last tick
+                    version = DATA_STORE.version
+                    if version != self._store_seen_version:
+                        self._store_seen_version = version
+                        fut = self._ser_pool.submit(_dumps, DATA_STORE.snapshot())
+                    else:
+                        fut = None
+                    if pending is not None:
+                        payload = pending.result()
+                        if payload != self._last_payload:
+                            self._last_payload = payload
+                            self._publish(f"{self._topic_prefix}/snapshot", payload)
+                    pending = fut
+
+                # Event.wait instead of sleep so stop() wakes the loop
+                # immediately rather than after up to a full interval
+                self._stop.wait(self._publish_interval)
             except Exception:
-                time.sleep(1)
+                self._stop.wait(1)
 
         self._client.loop_stop()
 
-    def _enqueue(self, msg: str, topic: str):
+    def _publish_deltas(self, snapshot: dict):
+        """Publish one message per changed key on its per-tag topic"""
+        last_get = self._last_values.get
+        prefix = self._topic_prefix
+        for key, value in snapshot.items():
+            if last_get(key, _MISSING) == value:
+                continue
+            self._last_values[key] = value
+            self._seq += 1
+            self._publish(f"{prefix}/tag/{key}",
+                          _dumps({'seq': self._seq, 'value': value}))
+
+    def _publish(self, topic: str, payload: bytes):
         try:
-            self._out_queue.put_nowait((topic, msg))
-        except Full:
-            # Drop oldest to keep most recent data (gateway-like behavior)
-            try:
-                self._out_queue.get_nowait()
-            except Empty:
-                pass
-            try:
-                self._out_queue.put_nowait((topic, msg))
-            except Full:
-                pass
+            self._client.publish(topic, payload, qos=self._qos, retain=self._retain)
+        except Exception:
+            # paho re-delivers queued messages after reconnect; a failed
+            # hand-off here just drops this tick's payload
+            pass
 
 
@@ -1,6 +1,8 @@
 import os
 import time
 import socket
+import struct
+import selectors
 from dotenv import load_dotenv
 from ..core.datastore import DATA_STORE
 from threading import Event
@@ -17,6 +19,35 @@ except ImportError:
     C104_AVAILABLE = False
     print("Warning: c104 library not available, using basic IEC104 simulation")
 
+# Precompiled packers for the simulated ASDU frames
+_F32 = struct.Struct('<f')
+_U16 = struct.Struct('<H')
+_U32 = struct.Struct('<I')
+
+# Frame layout: [0x68][Length][Type][SQ][COT][ORG][ASDU_ADDR:2][IOA:4][Value:4][Timestamp:3]
+_ASDU_LENGTH = 17
+_FRAME_SIZE = 2 + _ASDU_LENGTH
+_VALUE_OFFSET = 12
+
+# STARTDT act sent once per new connection
+_STARTDT_ACT = bytes((0x68, 0x04, 0x07, 0x00, 0x00, 0x00))
+
+
+def _build_frame_template(ioa: int) -> bytearray:
+    """Build the static part of an ASDU frame; only the value gets rewritten per tick"""
+    frame = bytearray(_FRAME_SIZE)
+    frame[0] = 0x68
+    frame[1] = _ASDU_LENGTH
+    frame[2] = 0x09  # M_ME_NC_1 (measured value, short float)
+    frame[3] = 0x01  # SQ
+    frame[4] = 0x03  # COT: spontaneous
+    frame[5] = 0x00  # ORG
+    _U16.pack_into(frame, 6, 0x0001)  # ASDU address
+    _U32.pack_into(frame, 8, ioa)  # IOA
+    # Value (4 bytes) and simplified timestamp (3 zero bytes) follow
+    return frame
+
+
 def _type_to_c104(type_str: str):
     if not C104_AVAILABLE:
         return type_str
@@ -37,85 +68,110 @@ def basic_iec104_server(host: str, port: int, stop_event: Event):
     try:
         server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        # Don't leak the listener into any subprocess the service spawns
+        server_socket.set_inheritable(False)
         server_socket.bind((host, port))
         server_socket.listen(5)
-        server_socket.settimeout(1.0)  # Non-blocking accept
-        
+        server_socket.setblocking(False)
+
+        # Block in the selector until a connection arrives or the next
+        # periodic send is due, instead of a 1 s accept timeout plus a
+        # 0.1 s sleep that burns CPU while idle
+        sel = selectors.DefaultSelector()
+        sel.register(server_socket, selectors.EVENT_READ)
+
         print(f"✓ IEC 60870-5-104 server started on {host}:{port}")
-        
+
         clients = []
         last_send_time = 0
-        
+        # data_id -> (frame bytearray, ioa); rebuilt only if the IOA changes
+        frame_cache = {}
+        # Cached (data_id, mapping) list, refreshed only when the mapping
+        # store's version counter moves — no dict copy on idle ticks
+        cached_maps = []
+        maps_seen_version = -1
+
         while not stop_event.is_set():
             try:
+                # Wake exactly for the next periodic send, an incoming
+                # connection, or (bounded) to notice the stop event.
+                # With no clients there is no send deadline to honour, so
+                # just block for the bounded interval instead of spinning
+                # on an already-expired deadline
+                if clients:
+                    timeout = max(0.0, last_send_time + 2.0 - time.time())
+                    timeout = min(timeout, 0.5)
+                else:
+                    timeout = 0.5
+                events = sel.select(timeout=timeout)
+
                 # Accept new connections
-                try:
-                    client_socket, addr = server_socket.accept()
-                    print(f"IEC104 client connected from {addr}")
-                    client_socket.settimeout(1.0)
-                    clients.append(client_socket)
-                    
-                    # Send STARTDT act (IEC104 connection initiation)
-                    startdt_act = bytes([0x68, 0x04, 0x07, 0x00, 0x00, 0x00])
-                    client_socket.send(startdt_act)
-                    print(f"Sent STARTDT act to {addr}")
-                    
-                except socket.timeout:
-                    pass
-                except Exception as e:
-                    print(f"IEC104 accept error: {e}")
-                
+                for _ in events:
+                    try:
+                        client_socket, addr = server_socket.accept()
+                        print(f"IEC104 client connected from {addr}")
+                        client_socket.settimeout(1.0)
+                        # Frames for a tick go out as one write; disable
+                        # Nagle so the batch isn't re-buffered
+                        client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                        clients.append(client_socket)
+
+                        # Send STARTDT act (IEC104 connection initiation)
+                        client_socket.send(_STARTDT_ACT)
+                        print(f"Sent STARTDT act to {addr}")
+
+                    except OSError:
+                        pass
+                    except Exception as e:
+                        print(f"IEC104 accept error: {e}")
+
                 # Send data to connected clients (proper IEC104 ASDU frames)
                 current_time = time.time()
                 if clients and (current_time - last_send_time) >= 2.0:  # Send every 2 seconds
-                    maps = IEC104_MAPPING.all()
-                    if maps:  # Only send if we have mappings
-                        for data_id, meta in maps.items():
+                    version = IEC104_MAPPING.version
+                    if version != maps_seen_version:
+                        cached_maps = list(IEC104_MAPPING.all().items())
+                        maps_seen_version = version
+                    if cached_maps:  # Only send if we have mappings
+                        frames = []
+                        for data_id, meta in cached_maps:
                             key = str(meta['key'])
                             ioa = int(meta['ioa'])
                             value = DATA_STORE.read(key)
-                            
+
                             if value is not None:
-                                # Create simplified IEC104 ASDU frame
-                                # Format: [Length][Type][SQ][COT][ORG][ASDU_ADDR][IOA][Value][Timestamp]
-                                asdu_type = 0x09  # M_ME_NC_1 (measured value, short float)
-                                cot = 0x03  # Spontaneous
-                                org = 0x00
-                                asdu_addr = 0x0001
-                                
-                                # Convert value to IEEE 754 float bytes
-                                import struct
-                                value_bytes = struct.pack('<f', float(value))
-                                
-                                # Build ASDU
-                                asdu_data = bytes([asdu_type, 0x01, cot, org])  # Type, SQ, COT, ORG
-                                asdu_data += struct.pack('<H', asdu_addr)  # ASDU address
-                                asdu_data += struct.pack('<I', ioa)  # IOA (3 bytes)
-                                asdu_data += value_bytes  # Value
-                                asdu_data += bytes(3)  # Timestamp (simplified)
-                                
-                                # Build complete frame: [Length][ASDU]
-                                frame_length = len(asdu_data)
-                                frame = bytes([0x68, frame_length]) + asdu_data
-                                
-                                # Send to all connected clients
-                                connected_clients = []
-                                for client in clients:
+                                # Reuse the cached frame for this mapping;
+                                # only the value bytes change per tick
+                                cached = frame_cache.get(data_id)
+                                if cached is None or cached[1] != ioa:
+                                    cached = (_build_frame_template(ioa), ioa)
+                                    frame_cache[data_id] = cached
+                                frame = cached[0]
+                                try:
+                                    _F32.pack_into(frame, _VALUE_OFFSET, float(value))
+                                except (ValueError, TypeError):
+                                    continue
+                                frames.append(frame)
+
+                        if frames:
+                            # One write per client for the whole tick
+                            # instead of one send per frame per client
+                            tick_bytes = b"".join(frames)
+                            connected_clients = []
+                            for client in clients:
+                                try:
+                                    client.sendall(tick_bytes)
+                                    connected_clients.append(client)
+                                except Exception as e:
+                                    print(f"IEC104 send error to client: {e}")
                                     try:
-                                        client.send(frame)
-                                        connected_clients.append(client)
-                                    except Exception as e:
-                                        print(f"IEC104 send error to client: {e}")
-                                        try:
-                                            client.close()
-                                        except Exception:
-                                            pass
-                                clients = connected_clients
-                    
+                                        client.close()
+                                    except Exception:
+                                        pass
+                            clients = connected_clients
+
                     last_send_time = current_time
-                
-                time.sleep(0.1)  # Shorter sleep for better responsiveness
-                
+
             except Exception as e:
                 print(f"IEC104 basic server error: {e}")
                 time.sleep(1)
@@ -129,6 +185,10 @@ def basic_iec104_server(host: str, port: int, stop_event: Event):
                 client.close()
             except Exception:
                 pass
+        try:
+            sel.close()
+        except Exception:
+            pass
         try:
             server_socket.close()
         except Exception:
@@ -160,6 +220,10 @@ def iec104_server_thread(stop_event: Event):
 
         # cache: key -> (point, type)
         point_cache = {}
+        # Cached (data_id, mapping) list keyed off the store's version
+        # counter, so point creation only re-scans after mapping changes
+        cached_maps = []
+        maps_seen_version = -1
 
         server.start()
         print(f"✓ IEC 60870-5-104 server started on {host}:{port}")
@@ -167,8 +231,11 @@ def iec104_server_thread(stop_event: Event):
         while not stop_event.is_set():
             try:
                 # Ensure points exist for mappings
-                maps = IEC104_MAPPING.all()
-                for data_id, meta in maps.items():
+                version = IEC104_MAPPING.version
+                if version != maps_seen_version:
+                    cached_maps = list(IEC104_MAPPING.all().items())
+                    maps_seen_version = version
+                for data_id, meta in cached_maps:
                     key = str(meta['key'])
                     ioa = int(meta['ioa'])
                     type_id = _type_to_c104(str(meta['type']))
@@ -10,10 +10,47 @@ import time
 # Load environment variables
 load_dotenv()
 
+# Precompiled packers and one converter per data type; the dict probe
+# replaces the string if/elif chain in the per-mapping inner loop
+_PACK_F32 = struct.Struct('>f').pack
+_UNPACK_HH = struct.Struct('>HH').unpack
+
+
+def _f32_to_registers(value):
+    # Float to two 16-bit registers (IEEE 754, big-endian)
+    return list(_UNPACK_HH(_PACK_F32(float(value))))
+
+
+def _i32_to_registers(value):
+    int_val = int(value)
+    return [(int_val >> 16) & 0xFFFF, int_val & 0xFFFF]  # High word, low word
+
+
+def _i16_to_registers(value):
+    return [int(value) & 0xFFFF]
+
+
+def _u16_to_registers(value):
+    return [int(abs(value)) & 0xFFFF]
+
+
+_REGISTER_CONVERTERS = {
+    'float32': _f32_to_registers,
+    'int32': _i32_to_registers,
+    'int16': _i16_to_registers,
+    'uint16': _u16_to_registers,
+}
+
+
 class DataBank:
     def __init__(self):
         self.server = None
         self.register_cache = {}  # Cache for register values
+        self._last = {}  # data_id -> last scaled value written to the bank
+        # Cached (data_id, mapping) list, rebuilt only when the mapping
+        # store's version counter moves — skips the per-tick dict copy
+        self._cached_maps = []
+        self._maps_seen_version = -1
     
     def update_from_mappings(self):
         """Update modbus data bank using the Modbus mappings"""
@@ -21,13 +58,23 @@ class DataBank:
             return
             
         try:
-            # Get all Modbus mappings
-            mappings = MODBUS_MAPPING.all()
-            
+            # Refresh the cached mapping list only when the store changed
+            version = MODBUS_MAPPING.version
+            if version != self._maps_seen_version:
+                self._cached_maps = list(MODBUS_MAPPING.all().items())
+                self._maps_seen_version = version
+                # Remapped points must be rewritten even if their value
+                # hasn't moved (new address or data type)
+                self._last.clear()
+
             # Group mappings by register address for efficient updates
             register_updates = {}
-            
-            for data_id, mapping in mappings.items():
+            # float32 conversions are batched into one pack/unpack pair
+            # below instead of two struct calls per value
+            f32_addrs = []
+            f32_values = []
+
+            for data_id, mapping in self._cached_maps:
                 key = mapping['key']
                 register_address = mapping['register_address']
                 data_type = mapping['data_type']
@@ -40,35 +87,57 @@ class DataBank:
                 
                 # Apply scaling
                 scaled_value = float(value) * scaling_factor
-                
+
+                # Skip unchanged values; the bank already holds their
+                # registers, so an idle tick does no conversion or writes
+                if self._last.get(data_id) == scaled_value:
+                    continue
+                self._last[data_id] = scaled_value
+
                 # Convert to Modbus register format based on data type
+                if data_type == 'float32':
+                    f32_addrs.append(register_address)
+                    f32_values.append(scaled_value)
+                    continue
                 registers = self._value_to_registers(scaled_value, data_type)
-                
+
                 # Store registers starting at the mapped address
                 for i, reg_value in enumerate(registers):
                     register_updates[register_address + i] = reg_value
-            
-            # Apply all register updates
+
+            if f32_values:
+                # One pack and one unpack for the whole batch; register
+                # pairs come out in mapping order, high word first
+                n = len(f32_values)
+                words = struct.unpack(f'>{2 * n}H', struct.pack(f'>{n}f', *f32_values))
+                for i, addr in enumerate(f32_addrs):
+                    register_updates[addr] = words[2 * i]
+                    register_updates[addr + 1] = words[2 * i + 1]
+
+            # Apply updates as contiguous block writes. The old code read
+            # the whole min..max span back from the bank and rewrote it;
+            # mapped registers are fully owned by us, so writing each
+            # contiguous run directly skips the read-back and never
+            # touches unmapped registers in between
             if register_updates:
-                # Find the range of registers to update
-                min_addr = min(register_updates.keys())
-                max_addr = max(register_updates.keys())
-                
-                # Read current register bank state
-                current_registers = self.server.data_bank.get_holding_registers(min_addr, max_addr - min_addr + 1)
-                if current_registers is None:
-                    current_registers = [0] * (max_addr - min_addr + 1)
-                
-                # Update with our new values
-                for addr, value in register_updates.items():
-                    if min_addr <= addr <= max_addr:
-                        current_registers[addr - min_addr] = value
-                
-                # Write back to server
-                self.server.data_bank.set_holding_registers(min_addr, current_registers)
-                
+                set_holding = self.server.data_bank.set_holding_registers
+                addrs = sorted(register_updates)
+                run_start = prev = addrs[0]
+                run_values = [register_updates[run_start]]
+                runs = 1
+                for addr in addrs[1:]:
+                    if addr == prev + 1:
+                        run_values.append(register_updates[addr])
+                    else:
+                        set_holding(run_start, run_values)
+                        runs += 1
+                        run_start = addr
+                        run_values = [register_updates[addr]]
+                    prev = addr
+                set_holding(run_start, run_values)
+
                 # Debug output
-                print(f"Modbus: Updated {len(register_updates)} registers from {min_addr} to {max_addr}")
+                print(f"Modbus: Updated {len(register_updates)} registers in {runs} block writes")
                 
         except Exception as e:
             print(f"Modbus mapping update error: {e}")
@@ -76,26 +145,7 @@ class DataBank:
     def _value_to_registers(self, value, data_type):
         """Convert a value to Modbus register format based on data type"""
         try:
-            if data_type == 'float32':
-                # Convert float to two 16-bit registers (IEEE 754)
-                packed = struct.pack('>f', float(value))  # Big-endian float
-                reg1, reg2 = struct.unpack('>HH', packed)
-                return [reg1, reg2]
-            elif data_type == 'int32':
-                # Convert int32 to two 16-bit registers
-                int_val = int(value)
-                reg1 = (int_val >> 16) & 0xFFFF  # High word
-                reg2 = int_val & 0xFFFF          # Low word
-                return [reg1, reg2]
-            elif data_type == 'int16':
-                # Single 16-bit register
-                return [int(value) & 0xFFFF]
-            elif data_type == 'uint16':
-                # Single unsigned 16-bit register
-                return [int(abs(value)) & 0xFFFF]
-            else:
-                # Default to int16
-                return [int(value) & 0xFFFF]
+            return _REGISTER_CONVERTERS.get(data_type, _i16_to_registers)(value)
         except Exception as e:
             print(f"Modbus register conversion error for {data_type}: {e}")
             return [0]
@@ -115,20 +165,30 @@ def modbus_server_thread(stop_event: Event):
         print(f"✓ Modbus TCP server started successfully on {host}:{port}")
         print("✓ Using Modbus mapping store for register addresses")
         
-        # Periodic update loop using mappings
-        update_counter = 0
+        # Wake on data store writes instead of polling every second; the
+        # 1 s timeout is a heartbeat that picks up mapping changes and
+        # bounds how stale the bank can get if a wake is ever missed
+        wake = Event()
+        DATA_STORE.add_change_listener(lambda key, old, new, now: wake.set())
+
+        last_mapping_log = time.time()
         while not stop_event.is_set():
             try:
-                # Update registers from mappings
+                wake.wait(timeout=1.0)
+                wake.clear()
+                if stop_event.is_set():
+                    break
+
+                # Update registers from mappings (near zero work when
+                # nothing changed, thanks to the dirty tracking)
                 data_bank.update_from_mappings()
-                
+
                 # Debug output every 10 seconds
-                update_counter += 1
-                if update_counter % 10 == 0:
+                now = time.time()
+                if now - last_mapping_log >= 10.0:
+                    last_mapping_log = now
                     mappings_count = len(MODBUS_MAPPING.all())
                     print(f"Modbus: Active mappings: {mappings_count}")
-                    
-                time.sleep(1)
             except Exception as e:
                 print(f"Modbus update loop error: {e}")
                 time.sleep(1)
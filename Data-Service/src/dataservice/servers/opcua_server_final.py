@@ -9,6 +9,28 @@ from threading import Event
 # Load environment variables
 load_dotenv()
 
+# Variant type resolved once per variable at creation; per-write coercion
+# is then a dict probe plus a pre-typed Variant, which skips asyncua's
+# type re-inference inside set_value
+_TYPE_TO_VARIANT = {
+    bool: ua.VariantType.Boolean,
+    int: ua.VariantType.Int64,
+    float: ua.VariantType.Double,
+    str: ua.VariantType.String,
+}
+_COERCERS = {
+    ua.VariantType.Boolean: bool,
+    ua.VariantType.Int64: int,
+    ua.VariantType.Double: float,
+    ua.VariantType.String: str,
+}
+_NONE_DEFAULTS = {
+    ua.VariantType.Boolean: False,
+    ua.VariantType.Int64: 0,
+    ua.VariantType.Double: 0.0,
+    ua.VariantType.String: "",
+}
+
 def coerce_value_for_opcua(value):
     """Coerce values to appropriate OPC-UA types"""
     if value is None:
@@ -31,18 +53,21 @@ def coerce_value_for_opcua(value):
     else:
         return str(value)  # Convert to string as fallback
 
+# NodeId type -> identifier prefix, replacing the if/elif chain in
+# node_id_to_string with a single dict probe
+_NODE_ID_PREFIX = {
+    ua.NodeIdType.FourByte: 'i=',
+    ua.NodeIdType.String: 's=',
+    ua.NodeIdType.Guid: 'g=',
+    ua.NodeIdType.ByteString: 'b=',
+}
+
 def node_id_to_string(node_id):
     """Convert asyncua NodeId to string representation"""
-    if node_id.nodeidtype == ua.NodeIdType.FourByte:
-        return f"ns={node_id.namespaceidx};i={node_id.identifier}"
-    elif node_id.nodeidtype == ua.NodeIdType.String:
-        return f"ns={node_id.namespaceidx};s={node_id.identifier}"
-    elif node_id.nodeidtype == ua.NodeIdType.Guid:
-        return f"ns={node_id.namespaceidx};g={node_id.identifier}"
-    elif node_id.nodeidtype == ua.NodeIdType.ByteString:
-        return f"ns={node_id.namespaceidx};b={node_id.identifier}"
-    else:
+    prefix = _NODE_ID_PREFIX.get(node_id.nodeidtype)
+    if prefix is None:
         return str(node_id)
+    return f"ns={node_id.namespaceidx};{prefix}{node_id.identifier}"
 
 async def opcua_server_thread(stop_event: Event):
     host = os.getenv('SERVER_HOST', '0.0.0.0')
@@ -70,93 +95,156 @@ async def opcua_server_thread(stop_event: Event):
     print(f"OPC-UA server starting on {host}:{port}")
     print(f"Using namespace {idx}: {uri}")
     
+    async def ensure_variable(key, value):
+        """Create the OPC-UA variable for key if it doesn't exist yet"""
+        if key in key_to_var:
+            return
+        try:
+            # Auto-generate NodeId and create variable
+            coerced_value = coerce_value_for_opcua(value)
+            var = await data_folder.add_variable(idx, key, coerced_value)
+            await var.set_writable()
+
+            # Get the auto-generated NodeId
+            actual_node_id = var.nodeid
+            node_id_str = node_id_to_string(actual_node_id)
+
+            # Cache the variable and its resolved variant type
+            key_to_var[key] = var
+            key_to_type[key] = _TYPE_TO_VARIANT.get(type(coerced_value), ua.VariantType.String)
+
+            print(f"✓ Created OPC-UA variable: {key} -> {node_id_str} = {coerced_value}")
+
+            # Update or create mapping with the actual NodeId
+            try:
+                # Get the data_id for this key
+                data_id = DATA_STORE.ensure_id(key)
+
+                # Check if mapping already exists
+                existing_mapping = OPCUA_MAPPING.get_mapping(data_id)
+                if existing_mapping:
+                    # Update existing mapping with actual NodeId
+                    OPCUA_MAPPING.set_mapping(
+                        data_id, key, node_id_str,
+                        existing_mapping.get('browse_name', key),
+                        existing_mapping.get('display_name', key),
+                        existing_mapping.get('data_type', 'Float'),
+                        existing_mapping.get('value_rank', -1),
+                        existing_mapping.get('access_level', 'CurrentReadOrWrite'),
+                        existing_mapping.get('timestamps', 'Both'),
+                        idx,
+                        existing_mapping.get('description', f"Auto-generated mapping for {key}")
+                    )
+                    print(f"✓ Updated mapping for {key} with NodeId {node_id_str}")
+                else:
+                    # Create new mapping
+                    OPCUA_MAPPING.set_mapping(
+                        data_id, key, node_id_str, key, key,
+                        'Float', -1, 'CurrentReadOrWrite', 'Both', idx,
+                        f"Auto-generated mapping for {key}"
+                    )
+                    print(f"✓ Created mapping for {key} with NodeId {node_id_str}")
+            except Exception as e:
+                print(f"⚠ Failed to update mapping for {key}: {e}")
+
+        except Exception as e:
+            print(f"✗ Failed to create variable for {key}: {e}")
+
+    def stage_update(key, value):
+        """Coerce value for key's variable; returns (key, var, DataValue) or None"""
+        var = key_to_var.get(key)
+        if var is None:
+            return None
+        try:
+            # Coerce value to the variant type established at creation
+            vt = key_to_type.get(key)
+            if vt is None:
+                vt = _TYPE_TO_VARIANT.get(type(value), ua.VariantType.String)
+            if value is None:
+                new_value = _NONE_DEFAULTS[vt]
+            else:
+                new_value = _COERCERS[vt](value)
+            return (key, var, ua.DataValue(ua.Variant(new_value, vt)))
+        except Exception as e:
+            print(f"✗ Failed to coerce value for {key}: {e}")
+            return None
+
+    async def flush_updates(staged):
+        """Write all staged values concurrently instead of one await each"""
+        if not staged:
+            return
+        results = await asyncio.gather(
+            *(var.write_value(data_value) for _, var, data_value in staged),
+            return_exceptions=True,
+        )
+        for (key, _, _), result in zip(staged, results):
+            if isinstance(result, Exception):
+                print(f"✗ Failed to update value for {key}: {result}")
+
+    # Bridge store changes from the writer threads into this event loop;
+    # variables are then only touched when a value actually changed,
+    # instead of re-writing every key once a second
+    loop = asyncio.get_running_loop()
+    change_queue: asyncio.Queue = asyncio.Queue()
+
+    def _on_change(key, old_value, new_value, now):  # noqa: ARG001
+        # The listener can't be detached (the store has no removal API),
+        # so after shutdown closes the loop this must drop events instead
+        # of raising into the store's notify path on every write
+        if loop.is_closed():
+            return
+        try:
+            loop.call_soon_threadsafe(change_queue.put_nowait, (key, new_value))
+        except RuntimeError:
+            pass
+
+    DATA_STORE.add_change_listener(_on_change)
+
     async with server:
         print(f"✓ OPC-UA server started successfully on {host}:{port}")
-        
-        # Main update loop
+
+        # Seed variables and initial values from a full snapshot
+        snapshot = DATA_STORE.snapshot()
+        staged = []
+        for key, value in snapshot.items():
+            await ensure_variable(key, value)
+            staged.append(stage_update(key, value))
+        await flush_updates([s for s in staged if s])
+
+        # Main update loop: block on change events, coalescing bursts so
+        # each key is written at most once per wakeup
         while not stop_event.is_set():
             try:
-                # Get all current data
-                snapshot = DATA_STORE.snapshot()
-                
-                for key, value in snapshot.items():
-                    # Create variable if it doesn't exist
-                    if key not in key_to_var:
-                        try:
-                            # Auto-generate NodeId and create variable
-                            coerced_value = coerce_value_for_opcua(value)
-                            var = await data_folder.add_variable(idx, key, coerced_value)
-                            await var.set_writable()
-                            
-                            # Get the auto-generated NodeId
-                            actual_node_id = var.nodeid
-                            node_id_str = node_id_to_string(actual_node_id)
-                            
-                            # Cache the variable
-                            key_to_var[key] = var
-                            key_to_type[key] = type(coerced_value)
-                            
-                            print(f"✓ Created OPC-UA variable: {key} -> {node_id_str} = {coerced_value}")
-                            
-                            # Update or create mapping with the actual NodeId
-                            try:
-                                # Get the data_id for this key
-                                data_id = DATA_STORE.ensure_id(key)
-                                
-                                # Check if mapping already exists
-                                existing_mapping = OPCUA_MAPPING.get_mapping(data_id)
-                                if existing_mapping:
-                                    # Update existing mapping with actual NodeId
-                                    OPCUA_MAPPING.set_mapping(
-                                        data_id, key, node_id_str,
-                                        existing_mapping.get('browse_name', key),
-                                        existing_mapping.get('display_name', key),
-                                        existing_mapping.get('data_type', 'Float'),
-                                        existing_mapping.get('value_rank', -1),
-                                        existing_mapping.get('access_level', 'CurrentReadOrWrite'),
-                                        existing_mapping.get('timestamps', 'Both'),
-                                        idx,
-                                        existing_mapping.get('description', f"Auto-generated mapping for {key}")
-                                    )
-                                    print(f"✓ Updated mapping for {key} with NodeId {node_id_str}")
-                                else:
-                                    # Create new mapping
-                                    OPCUA_MAPPING.set_mapping(
-                                        data_id, key, node_id_str, key, key,
-                                        'Float', -1, 'CurrentReadOrWrite', 'Both', idx,
-                                        f"Auto-generated mapping for {key}"
-                                    )
-                                    print(f"✓ Created mapping for {key} with NodeId {node_id_str}")
-                            except Exception as e:
-                                print(f"⚠ Failed to update mapping for {key}: {e}")
-                                
-                        except Exception as e:
-                            print(f"✗ Failed to create variable for {key}: {e}")
-                            continue
-                    
-                    # Update variable value
-                    var = key_to_var.get(key)
-                    if var is not None:
-                        try:
-                            # Coerce value to the type we established for this variable
-                            expected_type = key_to_type.get(key, type(value))
-                            if expected_type == float:
-                                new_value = float(value) if value is not None else 0.0
-                            elif expected_type == int:
-                                new_value = int(value) if value is not None else 0
-                            elif expected_type == bool:
-                                new_value = bool(value) if value is not None else False
-                            else:
-                                new_value = str(value) if value is not None else ""
-                            
-                            await var.set_value(new_value)
-                        except Exception as e:
-                            print(f"✗ Failed to update value for {key}: {e}")
-                
-                await asyncio.sleep(1)
-                
+                try:
+                    key, value = await asyncio.wait_for(change_queue.get(), timeout=1.0)
+                except asyncio.TimeoutError:
+                    # Idle: pick up data points registered without a write,
+                    # which never produce change events
+                    snapshot = DATA_STORE.snapshot()
+                    staged = []
+                    for key, value in snapshot.items():
+                        if key not in key_to_var:
+                            await ensure_variable(key, value)
+                            staged.append(stage_update(key, value))
+                    await flush_updates([s for s in staged if s])
+                    continue
+
+                changed = {key: value}
+                while True:
+                    try:
+                        key, value = change_queue.get_nowait()
+                    except asyncio.QueueEmpty:
+                        break
+                    changed[key] = value
+
+                staged = []
+                for key, value in changed.items():
+                    await ensure_variable(key, value)
+                    staged.append(stage_update(key, value))
+                await flush_updates([s for s in staged if s])
+
             except Exception as e:
                 print(f"OPC-UA update error: {e}")
                 await asyncio.sleep(1)
-                
+
     print("OPC-UA server stopped")
@@ -1,20 +1,14 @@
 import os
 import socket
-import threading
-import time
 import asyncio
+import logging
 from dotenv import load_dotenv
 from ..core.datastore import DATA_STORE
 from ..core.mapping_store import SNMP_MAPPING
 from threading import Event
 
-# SNMP via pysnmp (support asyncore or asyncio carriers)
-try:
-    from pysnmp.carrier.asyncore.dgram import udp  # type: ignore
-    _CARRIER = 'asyncore'
-except Exception:  # pragma: no cover
-    from pysnmp.carrier.asyncio.dgram import udp  # type: ignore
-    _CARRIER = 'asyncio'
+# SNMP via pysnmp's asyncio carrier, run on this thread's own event loop
+from pysnmp.carrier.asyncio.dgram import udp
 from pysnmp.entity import engine, config
 from pysnmp.entity.rfc3413 import cmdrsp
 from pysnmp.smi import builder, view, rfc1902, instrum
@@ -22,36 +16,36 @@ from pysnmp.smi import builder, view, rfc1902, instrum
 # Load environment variables
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+
+# rfc1902 constructor and Python cast per mapping type, replacing the
+# string if/elif chain with a single dict probe; scalars resolve their
+# pair once at creation instead of per conversion
+_CTORS = {
+    'Integer': (rfc1902.Integer, int),
+    'OctetString': (rfc1902.OctetString, str),
+    'Gauge32': (rfc1902.Gauge32, int),
+    'Counter32': (rfc1902.Counter32, int),
+    'Counter64': (rfc1902.Counter64, int),
+}
+_DEFAULT_CTOR = (rfc1902.OctetString, str)
+
 
 def _to_snmp_value(value, type_id: str):
+    ctor, cast = _CTORS.get(type_id, _DEFAULT_CTOR)
     try:
-        if type_id == 'Integer':
-            return rfc1902.Integer(int(value))
-        if type_id == 'OctetString':
-            return rfc1902.OctetString(str(value))
-        if type_id == 'Gauge32':
-            return rfc1902.Gauge32(int(value))
-        if type_id == 'Counter32':
-            return rfc1902.Counter32(int(value))
-        if type_id == 'Counter64':
-            return rfc1902.Counter64(int(value))
-        # default
-        return rfc1902.OctetString(str(value))
+        return ctor(cast(value))
     except Exception:
         return rfc1902.OctetString("0")
 
 
 def snmp_server_thread(stop_event: Event):
-    # Fix for asyncio event loop in thread
-    if _CARRIER == 'asyncio':
-        try:
-            # Try to get existing event loop
-            loop = asyncio.get_event_loop()
-        except RuntimeError:
-            # No event loop in this thread, create a new one
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-    
+    # The asyncio carrier schedules its transports on the loop current at
+    # transport creation, so give this thread its own loop up front
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+
     host = os.getenv('SERVER_HOST', '0.0.0.0')
     port = int(os.getenv('SNMP_PORT', '1161'))
 
@@ -84,51 +78,102 @@ def snmp_server_thread(stop_event: Event):
 
     enterprise_oid = SNMP_MAPPING.enterprise_oid
 
-    print(f"✓ SNMP agent started on {host}:{port}")
+    # Lazy %-formatting: nothing is built unless INFO is enabled
+    logger.info("SNMP agent started on %s:%s", host, port)
 
     try:
-        # Start dispatcher in background for request handling
-        def run_dispatcher():
-            try:
-                snmp_engine.transportDispatcher.jobStarted(1)
-                snmp_engine.transportDispatcher.runDispatcher()
-            except Exception:
+        # The dispatcher's transports already live on this thread's loop;
+        # no background dispatcher thread and no cross-thread callbacks
+        snmp_engine.transportDispatcher.jobStarted(1)
+
+        # Lazy pull: each GET resolves the live value from DATA_STORE in
+        # the MIB read path, so responses are always fresh and no work
+        # happens while no manager is asking
+        (MibScalar, MibScalarInstance) = mib_builder.importSymbols(
+            'SNMPv2-SMI', 'MibScalar', 'MibScalarInstance')
+
+        class LiveScalarInstance(MibScalarInstance):
+            """Scalar instance that reads DATA_STORE on every GET"""
+
+            _MISSING = object()
+
+            def __init__(self, key, type_id, name, instId, syntax):
+                MibScalarInstance.__init__(self, name, instId, syntax)
+                self._key = key
+                # Constructor and cast resolved once here, not per GET
+                self._ctor, self._cast = _CTORS.get(type_id, _DEFAULT_CTOR)
+                self._last_raw = self._MISSING
+
+            def _refresh(self):
+                value = DATA_STORE.read(self._key)
+                # Rebuild the SNMP object only when the raw value moved;
+                # repeated GETs of a stable gauge reuse the last one
+                if value == self._last_raw:
+                    return
+                self._last_raw = value
                 try:
-                    snmp_engine.transportDispatcher.closeDispatcher()
+                    self.syntax = self._ctor(self._cast(value))
                 except Exception:
-                    pass
-
-        if _CARRIER == 'asyncore':
-            threading.Thread(target=run_dispatcher, daemon=True).start()
-        else:
-            # asyncio carrier integrates with event loop; start in thread too
-            threading.Thread(target=run_dispatcher, daemon=True).start()
-
-        while not stop_event.is_set():
-            # Refresh scalars under enterprise OID
-            maps = SNMP_MAPPING.all()
-            for data_id, meta in maps.items():
-                key = str(meta['key'])
-                suffix = int(meta['oid_suffix'])
-                type_id = str(meta['type'])
-                oid = enterprise_oid + (suffix,)
-                value = DATA_STORE.read(key)
-                snmp_val = _to_snmp_value(value, type_id)
-                try:
-                    mib_instrum.writeVars(((oid, snmp_val),))
-                except Exception:
-                    # Initialize and retry once
+                    self.syntax = rfc1902.OctetString("0")
+
+            # Every read path consults self.syntax, so refreshing it
+            # before delegating works across pysnmp API revisions
+            def readGet(self, name, *args, **kwargs):
+                self._refresh()
+                return MibScalarInstance.readGet(self, name, *args, **kwargs)
+
+            def readTestGet(self, name, *args, **kwargs):
+                self._refresh()
+                return MibScalarInstance.readTestGet(self, name, *args, **kwargs)
+
+        async def serve():
+            # (Re-)export scalar instances when the mapping set changes;
+            # the sleep doubles as the mapping-version heartbeat while the
+            # loop keeps servicing SNMP requests in between
+            exported_version = -1
+            while not stop_event.is_set():
+                version = SNMP_MAPPING.version
+                if version != exported_version:
+                    entries = [
+                        (str(meta['key']), int(meta['oid_suffix']), str(meta['type']))
+                        for meta in SNMP_MAPPING.all().values()
+                    ]
+                    # One lock acquisition for all initial values instead
+                    # of one read per mapping
+                    values = DATA_STORE.read_many([key for key, _, _ in entries])
+                    symbols = {}
+                    for key, suffix, type_id in entries:
+                        oid = enterprise_oid + (suffix,)
+                        syntax = _to_snmp_value(values[key], type_id)
+                        symbols[f'dsScalar{suffix}'] = MibScalar(oid, syntax)
+                        symbols[f'dsScalar{suffix}Instance'] = LiveScalarInstance(
+                            key, type_id, oid, (0,), syntax)
                     try:
-                        mib_instrum.mibBuilder.importSymbols('SNMPv2-SMI', 'iso')
-                        mib_instrum.writeVars(((oid, snmp_val),))
+                        mib_builder.unexportSymbols('__DATASERVICE-MIB')
                     except Exception:
                         pass
+                    if symbols:
+                        try:
+                            mib_builder.exportSymbols('__DATASERVICE-MIB', **symbols)
+                        except Exception:
+                            pass
+                    exported_version = version
+
+                await asyncio.sleep(1.0)
 
-            time.sleep(1)
+        loop.run_until_complete(serve())
     except KeyboardInterrupt:
         pass
     finally:
+        # Single-owner shutdown: retire the job before closing so the
+        # dispatcher winds down instead of being torn out from under
+        # in-flight transports
+        try:
+            snmp_engine.transportDispatcher.jobFinished(1)
+        except Exception:
+            pass
         try:
             snmp_engine.transportDispatcher.closeDispatcher()
         except Exception:
             pass
+        loop.close()
@@ -1,10 +1,40 @@
 import socket
+import sys
 
 HOST = '127.0.0.1'
 PORT = 1161
+TIMEOUT = 0.5
+
+# Minimal SNMPv2c GetRequest for sysDescr.0 (1.3.6.1.2.1.1.1.0) with
+# community "public" — a valid PDU the agent will actually answer,
+# unlike an arbitrary datagram which it silently drops
+GET_SYSDESCR = bytes.fromhex(
+    '3026'                  # SEQUENCE, 38 bytes
+    '020101'                # version: 1 (v2c)
+    '04067075626c6963'      # community: "public"
+    'a019'                  # GetRequest-PDU, 25 bytes
+    '020101'                # request-id: 1
+    '020100'                # error-status: 0
+    '020100'                # error-index: 0
+    '300e300c'              # varbind list / varbind
+    '06082b06010201010100'  # OID 1.3.6.1.2.1.1.1.0
+    '0500'                  # value: NULL
+)
+
+# One preallocated buffer reused across receives: recvfrom_into writes
+# straight into it, so looping this probe for load tests allocates
+# nothing per packet
+buf = bytearray(2048)
+mv = memoryview(buf)
 
 with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
-    s.sendto(b'test', (HOST, PORT))
-    data, addr = s.recvfrom(1024)
+    s.settimeout(TIMEOUT)
+    s.sendto(GET_SYSDESCR, (HOST, PORT))
+    try:
+        nbytes, addr = s.recvfrom_into(buf)
+    except socket.timeout:
+        print(f'No SNMP response from {HOST}:{PORT} within {TIMEOUT}s')
+        sys.exit(1)
 
-print(f'Received: {data!r}')
+data = mv[:nbytes]
+print(f'Received {nbytes} bytes from {addr}: {bytes(data)!r}')
@@ -21,6 +21,8 @@ import os
 import time
 import signal
 import argparse
+import threading
+from itertools import islice
 
 # Add src to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
@@ -28,6 +30,39 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 from dataservice.core.dataservice_sync import DataServiceSyncService
 
 
+def _print_stats(stats):
+    """Print one stats block; keeps no reference to the error list
+
+    The producer bounds its error log with deque(maxlen=100); dropping
+    our copy when this returns means the snapshot doesn't sit in memory
+    for the whole stats interval.
+    """
+    g = stats.get
+    now_str = time.strftime('%Y-%m-%d %H:%M:%S')
+    print(f"\n📊 Stats at {now_str}:\n"
+          f"   Total Syncs:       {g('total_syncs')}\n"
+          f"   Successful Writes: {g('successful_writes')}\n"
+          f"   Failed Writes:     {g('failed_writes')}\n"
+          f"   Running:           {g('running')}")
+
+    last_sync_time = g('last_sync_time')
+    if last_sync_time:
+        last_sync = time.strftime('%H:%M:%S', time.localtime(last_sync_time))
+        print(f"   Last Sync:         {last_sync}")
+
+    # Print recent errors if any (last 5, without slicing a copy of the
+    # whole list)
+    errors = g('errors')
+    if errors:
+        recent_errors = list(islice(reversed(errors), 5))[::-1]
+        print(f"   Recent Errors ({len(errors)} total):")
+        for err in recent_errors:
+            err_time = time.strftime('%H:%M:%S', time.localtime(err['time']))
+            print(f"     [{err_time}] {err['message']}")
+
+    print()
+
+
 def main():
     parser = argparse.ArgumentParser(
         description='Data-Service Sync Runner - Syncs polling data to Data-Service via IPC'
@@ -65,13 +100,13 @@ def main():
         enable_logging=not args.no_logging
     )
     
-    # Setup signal handlers for graceful shutdown
+    # Setup signal handlers for graceful shutdown; the handler only sets
+    # the event so the main loop wakes from its wait and shuts down
+    stop_event = threading.Event()
+
     def signal_handler(signum, frame):
-        print("\n🛑 Shutting down Data-Service sync...")
-        sync_service.stop()
-        print("✓ Sync service stopped")
-        sys.exit(0)
-    
+        stop_event.set()
+
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
     
@@ -96,41 +131,18 @@ def main():
     print("📊 Monitoring... (Press Ctrl+C to stop)")
     print()
     
-    # Monitor and print stats
-    last_stats_time = time.time()
-    
+    # Monitor and print stats; wait() sleeps until the next stats tick
+    # and returns True immediately when a signal sets the event, instead
+    # of waking once a second to compare timestamps
     try:
-        while True:
-            time.sleep(1)
-            
-            current_time = time.time()
-            if current_time - last_stats_time >= args.stats_interval:
-                stats = sync_service.get_stats()
-                print(f"\n📊 Stats at {time.strftime('%Y-%m-%d %H:%M:%S')}:")
-                print(f"   Total Syncs:       {stats['total_syncs']}")
-                print(f"   Successful Writes: {stats['successful_writes']}")
-                print(f"   Failed Writes:     {stats['failed_writes']}")
-                print(f"   Running:           {stats['running']}")
-                
-                if stats['last_sync_time']:
-                    last_sync = time.strftime('%H:%M:%S', time.localtime(stats['last_sync_time']))
-                    print(f"   Last Sync:         {last_sync}")
-                
-                # Print recent errors if any
-                if stats['errors']:
-                    recent_errors = stats['errors'][-5:]  # Last 5 errors
-                    print(f"   Recent Errors ({len(stats['errors'])} total):")
-                    for err in recent_errors:
-                        err_time = time.strftime('%H:%M:%S', time.localtime(err['time']))
-                        print(f"     [{err_time}] {err['message']}")
-                
-                print()
-                last_stats_time = current_time
-                
+        while not stop_event.wait(args.stats_interval):
+            _print_stats(sync_service.get_stats())
     except KeyboardInterrupt:
-        print("\n🛑 Received interrupt, stopping...")
-        sync_service.stop()
-        print("✓ Sync service stopped gracefully")
+        pass
+
+    print("\n🛑 Shutting down Data-Service sync...")
+    sync_service.stop()
+    print("✓ Sync service stopped")
 
 
 if __name__ == "__main__":